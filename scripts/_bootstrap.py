@@ -0,0 +1,33 @@
+"""
+Shared sys.path setup for the entrypoint scripts.
+
+Makes the original analysis code (the ``code`` directory next to this
+repository) importable. The path is added at most once per process, no
+matter how many scripts import this module.
+
+Set RCS_CODE_DIR to use a different location, or to an empty string when
+the analysis packages are installed and no sys.path change is needed.
+"""
+
+import os
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CODE_DIR = os.environ.get('RCS_CODE_DIR',
+                          os.path.normpath(os.path.join(PROJECT_ROOT, '..', 'code')))
+
+
+def _add_code_dir():
+    """
+    Appends CODE_DIR to sys.path if it exists and is not already there.
+    
+    Appending (rather than prepending) keeps the stdlib and site-packages
+    first, so the many numpy/pandas/scipy imports do not probe CODE_DIR.
+    """
+    if not CODE_DIR or CODE_DIR in set(sys.path):
+        return
+    if os.path.isdir(CODE_DIR):
+        sys.path.append(CODE_DIR)
+
+
+_add_code_dir()
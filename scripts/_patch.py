@@ -0,0 +1,46 @@
+"""
+Helpers for temporarily replacing attributes on the original analysis modules.
+"""
+
+import os
+import sys
+import contextlib
+
+_MISSING = object()
+
+
+@contextlib.contextmanager
+def patched_attrs(module, **replacements):
+    """
+    Temporarily set attributes on a module, restoring them on exit.
+    
+    Attributes that did not exist before are removed again on exit.
+    
+    Args:
+        module: Module (or any object) to patch
+        **replacements: Attribute name -> replacement value
+    """
+    originals = {name: getattr(module, name, _MISSING) for name in replacements}
+    for name, value in replacements.items():
+        setattr(module, name, value)
+    try:
+        yield module
+    finally:
+        for name, value in originals.items():
+            if value is _MISSING:
+                delattr(module, name)
+            else:
+                setattr(module, name, value)
+
+
+def patched_argv(argv, prog):
+    """
+    Temporarily replace sys.argv for scripts that parse it themselves.
+    
+    Args:
+        argv: Arguments (without the program name), or None to leave sys.argv as is
+        prog: Program name to place in sys.argv[0]
+    """
+    if argv is None:
+        return contextlib.nullcontext()
+    return patched_attrs(sys, argv=[os.fspath(prog), *argv])
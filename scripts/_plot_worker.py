@@ -0,0 +1,56 @@
+"""
+Long-lived worker process for the plot scripts.
+
+Started by run_pipeline.py in --isolated mode so plot steps still run outside
+the pipeline process, but pay the numpy/pandas/matplotlib import cost once
+per worker instead of once per script.
+
+Protocol: one JSON command per line on stdin,
+    {"script": "plot_psd", "args": ["--psd_file", "..."]}
+and one line with the exit code written to the acknowledgment file
+descriptor given as the only command-line argument. Script output goes to
+the inherited stdout/stderr. The worker exits when stdin is closed.
+"""
+
+import os
+import sys
+import json
+import importlib
+
+
+def _preload():
+    """Imports the heavy libraries shared by all plot scripts, if available."""
+    for name in ('numpy', 'pandas', 'scipy', 'matplotlib.pyplot'):
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            pass
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    ack = os.fdopen(int(argv[0]), 'w', buffering=1)
+
+    # Imported here so the module path setup matches the pipeline's
+    from run_pipeline import SCRIPTS_DIR, _run_in_process
+
+    _preload()
+
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        command = json.loads(line)
+        script_path = SCRIPTS_DIR / f"{command['script']}.py"
+        returncode = _run_in_process(script_path, command.get('args'))
+
+        # Don't carry figures over into the next script
+        pyplot = sys.modules.get('matplotlib.pyplot')
+        if pyplot is not None:
+            pyplot.close('all')
+
+        ack.write(f"{returncode}\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+"""
+In-process cache for parsed YAML config files.
+
+Configs are keyed on (absolute path, mtime, size), so an edited file is
+re-parsed while repeated loads of an unchanged file cost a dict lookup.
+"""
+
+import os
+import copy
+import logging
+import yaml
+
+logger = logging.getLogger(__name__)
+
+# Prefer the libyaml-backed loader; fall back to the pure-Python one
+if hasattr(yaml, 'CSafeLoader'):
+    _YAML_LOADER = yaml.CSafeLoader
+else:
+    logger.info("libyaml not available, using pure-Python YAML loader "
+                "(reinstall PyYAML with libyaml for faster config loading)")
+    _YAML_LOADER = yaml.SafeLoader
+_YAML_DUMPER = getattr(yaml, 'CSafeDumper', yaml.SafeDumper)
+
+_cache = {}
+
+
+def parse_yaml(path):
+    """
+    Parse a YAML file with the shared loader.
+    
+    The file is read whole in binary mode so libyaml decodes it directly,
+    skipping Python's text I/O layer and chunked stream reads.
+    
+    Args:
+        path: Path to YAML file
+        
+    Returns:
+        Parsed YAML content
+    """
+    with open(path, 'rb') as f:
+        return yaml.load(f.read(), Loader=_YAML_LOADER)
+
+
+def parse_yaml_source(source):
+    """
+    Parse YAML source text with the shared loader.
+    
+    Args:
+        source: YAML document as str or bytes
+        
+    Returns:
+        Parsed YAML content
+    """
+    return yaml.load(source, Loader=_YAML_LOADER)
+
+
+def scan_yaml_source(source):
+    """
+    Tokenize YAML source text with the shared loader.
+    
+    Args:
+        source: YAML document as str or bytes
+        
+    Returns:
+        List of yaml tokens (with start_mark/end_mark positions)
+    """
+    return list(yaml.scan(source, Loader=_YAML_LOADER))
+
+
+def dump_yaml(data, stream):
+    """
+    Write data as block-style YAML with the shared dumper, keeping key order.
+    
+    Args:
+        data: Config structure to serialize
+        stream: Open text file to write to
+    """
+    yaml.dump(data, stream, Dumper=_YAML_DUMPER,
+              default_flow_style=False, sort_keys=False)
+
+
+def load_yaml_cached(path):
+    """
+    Load a YAML file, reusing the parsed result if the file is unchanged.
+
+    Args:
+        path: Path to YAML file
+
+    Returns:
+        Parsed YAML content (a fresh copy, safe for the caller to mutate)
+
+    Raises:
+        FileNotFoundError: If the file does not exist
+    """
+    abs_path = os.path.abspath(path)
+    st = os.stat(abs_path)
+    key = (abs_path, st.st_mtime_ns, st.st_size)
+
+    if key not in _cache:
+        _cache[key] = parse_yaml(abs_path)
+
+    return copy.deepcopy(_cache[key])
@@ -7,25 +7,32 @@ Analyzes frequency band power around state transitions.
 
 import sys
 import os
-import argparse
+from pathlib import Path
 
 # Add the original code directory to path
-original_code_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), '..', 'code')
-if os.path.exists(original_code_dir):
-    sys.path.insert(0, original_code_dir)
+import _bootstrap
 
-if __name__ == "__main__":
-    from process_transitions.analyze_transition_effects import main
-    
-    # The original script loads config from its directory
-    # We'll update the path to look in configs/
-    parser = argparse.ArgumentParser(description="Analyze frequency band power around state transitions")
-    parser.add_argument('--config',
-                       default=os.path.join(os.path.dirname(os.path.dirname(__file__)), 'configs', 'transitions.yaml'),
-                       help='Path to YAML configuration file')
+from _patch import patched_argv
+
+# Get the configs directory
+CONFIG_DIR = Path(__file__).resolve().parent.parent / 'configs'
+
+
+def main(argv=None):
+    """Runs the original transition effects analysis with configs/transitions.yaml."""
+    from process_transitions.analyze_transition_effects import main as original_main
     
-    args = parser.parse_args()
+    if argv is None:
+        argv = sys.argv[1:]
     
-    import sys as sys_module
-    sys_module.argv = ['analyze_transitions.py', '--config', args.config]
-    main()
+    # The original script parses its own arguments and loads config from its
+    # directory; point it at configs/ unless --config was given explicitly
+    if not any(arg == '--config' or arg.startswith('--config=') for arg in argv):
+        argv = [*argv, '--config', str(CONFIG_DIR / 'transitions.yaml')]
+    with patched_argv(argv, __file__):
+        original_main()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,97 +8,123 @@ Uses configs/freq_bands.yaml, configs/plot_config.yaml, and configs/plot_statist
 
 import sys
 import os
+import copy
 import argparse
-import yaml
+from functools import partial
+from pathlib import Path
 
 # Add the original code directory to path
-original_code_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), '..', 'code')
-if os.path.exists(original_code_dir):
-    sys.path.insert(0, original_code_dir)
-
-# Import the original script's functions
-from processing_freq_band.plot_frequency_bands_results import (
-    load_frequency_bands_config,
-    load_plot_config,
-    main as original_main
-)
-
-def load_frequency_bands_config_updated(config_file=None):
+import _bootstrap
+
+from _yaml_cache import load_yaml_cached
+from _patch import patched_attrs, patched_argv
+
+# Get the configs directory
+CONFIG_DIR = Path(__file__).resolve().parent.parent / 'configs'
+
+# Default statistics configuration, used when plot_statistics.yaml is missing
+_DEFAULT_STATS_CONFIG = {
+    'tests': {
+        'ttest': {'enabled': True},
+        'wilcoxon': {'enabled': True},
+        'unblocked_permutation': {'enabled': True, 'n_permutations': 1000, 'random_seed': 42, 'show_progress': False},
+        'within_block_permutation': {'enabled': True, 'n_permutations': 1000, 'show_progress': False}
+    },
+    'min_samples': {
+        'ttest': 2,
+        'wilcoxon': 2,
+        'unblocked_permutation': 2,
+        'within_block_permutation': 1
+    },
+    'significance_threshold': 0.05,
+    'display': {
+        'show_pvalues': True,
+        'show_test_statistics': False,
+        'show_effect_sizes': False,
+        'pvalue_format': 'scientific',
+        'pvalue_decimals': 3,
+        'show_significance_stars': True
+    }
+}
+
+
+def load_frequency_bands_config_updated(config_file=None, fallback=None):
     """Loads freq_bands.yaml from configs/ directory."""
     if config_file is None:
-        script_dir = os.path.dirname(os.path.dirname(__file__))
-        config_file = os.path.join(script_dir, 'configs', 'freq_bands.yaml')
-    return load_frequency_bands_config(config_file)
+        config_file = CONFIG_DIR / 'freq_bands.yaml'
+    try:
+        return load_yaml_cached(config_file)
+    except FileNotFoundError:
+        # Let the original loader handle missing files
+        if fallback is None:
+            from processing_freq_band.plot_frequency_bands_results import load_frequency_bands_config as fallback
+        return fallback(os.fspath(config_file))
 
 
-def load_plot_config_updated(config_file=None):
+def load_plot_config_updated(config_file=None, fallback=None):
     """
-    Load plot config with updated path to configs/ directory.
+    Load plot config from $RCS_PLOT_CONFIG or the configs/ directory.
     """
     if config_file is None:
-        script_dir = os.path.dirname(os.path.dirname(__file__))
-        config_file = os.path.join(script_dir, 'configs', 'plot_config.yaml')
-    return load_plot_config(config_file)
+        config_file = os.environ.get('RCS_PLOT_CONFIG')
+    if config_file is None:
+        config_file = CONFIG_DIR / 'plot_config.yaml'
+    try:
+        return load_yaml_cached(config_file)
+    except FileNotFoundError:
+        # Let the original loader handle missing files
+        if fallback is None:
+            from processing_freq_band.plot_frequency_bands_results import load_plot_config as fallback
+        return fallback(os.fspath(config_file))
 
 
 def load_stats_config(config_file=None):
     """Loads plot_statistics.yaml from configs/ directory."""
     if config_file is None:
-        script_dir = os.path.dirname(os.path.dirname(__file__))
-        config_file = os.path.join(script_dir, 'configs', 'plot_statistics.yaml')
+        config_file = CONFIG_DIR / 'plot_statistics.yaml'
     
-    if os.path.exists(config_file):
-        with open(config_file, 'r') as f:
-            config = yaml.safe_load(f)
-        print(f"Loaded statistics configuration from: {config_file}")
-        return config
-    else:
+    try:
+        config = load_yaml_cached(config_file)
+    except FileNotFoundError:
         print(f"WARNING: Statistics config file not found: {config_file}")
         print("Using default statistics configuration")
-        # Return default config
-        return {
-            'tests': {
-                'ttest': {'enabled': True},
-                'wilcoxon': {'enabled': True},
-                'unblocked_permutation': {'enabled': True, 'n_permutations': 1000, 'random_seed': 42, 'show_progress': False},
-                'within_block_permutation': {'enabled': True, 'n_permutations': 1000, 'show_progress': False}
-            },
-            'min_samples': {
-                'ttest': 2,
-                'wilcoxon': 2,
-                'unblocked_permutation': 2,
-                'within_block_permutation': 1
-            },
-            'significance_threshold': 0.05,
-            'display': {
-                'show_pvalues': True,
-                'show_test_statistics': False,
-                'show_effect_sizes': False,
-                'pvalue_format': 'scientific',
-                'pvalue_decimals': 3,
-                'show_significance_stars': True
-            }
-        }
+        return copy.deepcopy(_DEFAULT_STATS_CONFIG)
+    
+    print(f"Loaded statistics configuration from: {config_file}")
+    return config
 
 
-if __name__ == "__main__":
+def main(argv=None):
+    """Runs the original plot script with config loading redirected to configs/."""
+    # Import the original script's functions (deferred so --help and
+    # plain imports of this module skip numpy/pandas/matplotlib); the
+    # originals are passed to the *_updated loaders as the fallback for
+    # missing files, since the module attributes are patched below
+    from processing_freq_band.plot_frequency_bands_results import (
+        load_frequency_bands_config,
+        load_plot_config,
+        main as original_main
+    )
+    
+    # Expose the plot config path to anything that reads RCS_PLOT_CONFIG
+    os.environ.setdefault('RCS_PLOT_CONFIG', str(CONFIG_DIR / 'plot_config.yaml'))
+    
     # Monkey-patch the config loading functions to use new paths
     import processing_freq_band.plot_frequency_bands_results as plot_module
-    original_load_freq_config = plot_module.load_frequency_bands_config
-    original_load_plot_config = plot_module.load_plot_config
     
+    patches = {
+        'load_frequency_bands_config': partial(load_frequency_bands_config_updated,
+                                               fallback=load_frequency_bands_config),
+        'load_plot_config': partial(load_plot_config_updated, fallback=load_plot_config),
+    }
     # Add load_stats_config function if it doesn't exist
     if not hasattr(plot_module, 'load_stats_config'):
-        plot_module.load_stats_config = load_stats_config
-    
-    plot_module.load_frequency_bands_config = load_frequency_bands_config_updated
-    plot_module.load_plot_config = load_plot_config_updated
+        patches['load_stats_config'] = load_stats_config
     
-    try:
+    with patched_argv(argv, __file__), patched_attrs(plot_module, **patches):
         original_main()
-    finally:
-        # Restore original functions
-        plot_module.load_frequency_bands_config = original_load_freq_config
-        plot_module.load_plot_config = original_load_plot_config
-        if hasattr(plot_module, 'load_stats_config'):
-            delattr(plot_module, 'load_stats_config')
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
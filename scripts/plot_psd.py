@@ -12,35 +12,54 @@ Creates four plot types:
 import sys
 import os
 import argparse
+from functools import partial
+from pathlib import Path
 
 # Add the original code directory to path
-original_code_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), '..', 'code')
-if os.path.exists(original_code_dir):
-    sys.path.insert(0, original_code_dir)
-
-# Import the original script's functions
-from processing_freq_band.plot_psd_results import (
-    load_plot_config,
-    main as original_main
-)
-
-def load_plot_config_updated(config_file=None):
-    """Loads plot_config.yaml from configs/ directory."""
+import _bootstrap
+
+from _yaml_cache import load_yaml_cached
+from _patch import patched_attrs, patched_argv
+
+# Get the configs directory
+CONFIG_DIR = Path(__file__).resolve().parent.parent / 'configs'
+
+def load_plot_config_updated(config_file=None, fallback=None):
+    """Loads plot_config.yaml from $RCS_PLOT_CONFIG or the configs/ directory."""
+    if config_file is None:
+        config_file = os.environ.get('RCS_PLOT_CONFIG')
     if config_file is None:
-        script_dir = os.path.dirname(os.path.dirname(__file__))
-        config_file = os.path.join(script_dir, 'configs', 'plot_config.yaml')
-    return load_plot_config(config_file)
+        config_file = CONFIG_DIR / 'plot_config.yaml'
+    try:
+        return load_yaml_cached(config_file)
+    except FileNotFoundError:
+        # Let the original loader handle missing files
+        if fallback is None:
+            from processing_freq_band.plot_psd_results import load_plot_config as fallback
+        return fallback(os.fspath(config_file))
 
 
-if __name__ == "__main__":
+def main(argv=None):
+    """Runs the original plot script with config loading redirected to configs/."""
+    # Import the original script's functions (deferred so --help and
+    # plain imports of this module skip numpy/pandas/matplotlib); the
+    # originals are passed to the *_updated loaders as the fallback for
+    # missing files, since the module attributes are patched below
+    from processing_freq_band.plot_psd_results import (
+        load_plot_config,
+        main as original_main
+    )
+    
+    # Expose the plot config path to anything that reads RCS_PLOT_CONFIG
+    os.environ.setdefault('RCS_PLOT_CONFIG', str(CONFIG_DIR / 'plot_config.yaml'))
+    
     # Monkey-patch the config loading function to use new path
     import processing_freq_band.plot_psd_results as plot_module
-    original_load_plot_config = plot_module.load_plot_config
-    
-    plot_module.load_plot_config = load_plot_config_updated
     
-    try:
+    with patched_argv(argv, __file__), patched_attrs(plot_module, load_plot_config=partial(load_plot_config_updated, fallback=load_plot_config)):
         original_main()
-    finally:
-        # Restore original function
-        plot_module.load_plot_config = original_load_plot_config
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
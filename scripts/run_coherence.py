@@ -9,11 +9,19 @@ import sys
 import os
 
 # Add the original code directory to path
-original_code_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), '..', 'code')
-if os.path.exists(original_code_dir):
-    sys.path.insert(0, original_code_dir)
+import _bootstrap
+
+from _patch import patched_argv
+
+
+def main(argv=None):
+    """Imports and runs the original script's main function."""
+    from processing_freq_band.calculate_coherence_bg_cortex import main as original_main
+    
+    with patched_argv(argv, __file__):
+        original_main()
+    return 0
+
 
-# Import and run the original script's main function
 if __name__ == "__main__":
-    from processing_freq_band.calculate_coherence_bg_cortex import main
-    main()
+    sys.exit(main())
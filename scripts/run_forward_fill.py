@@ -7,32 +7,50 @@ Adds Adaptive_CurrentAdaptiveState_filled column to raw_data.parquet files.
 
 import sys
 import os
-import argparse
-import yaml
 from pathlib import Path
+from types import SimpleNamespace
 
 # Add the original code directory to path
-original_code_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), '..', 'code')
-if os.path.exists(original_code_dir):
-    sys.path.insert(0, original_code_dir)
+import _bootstrap
+
+from _yaml_cache import parse_yaml
+from _patch import patched_argv
 
 # Get the scripts directory
-SCRIPTS_DIR = Path(__file__).parent
+SCRIPTS_DIR = Path(__file__).resolve().parent
 PROJECT_ROOT = SCRIPTS_DIR.parent
+CONFIG_DIR = PROJECT_ROOT / 'configs'
 
 
 def load_main_config(config_path=None):
     """Loads pipeline_main.yaml config."""
     if config_path is None:
-        config_path = PROJECT_ROOT / 'configs' / 'pipeline_main.yaml'
+        config_path = CONFIG_DIR / 'pipeline_main.yaml'
     
-    if os.path.exists(config_path):
-        with open(config_path, 'r') as f:
-            return yaml.safe_load(f)
-    return None
+    try:
+        return parse_yaml(config_path)
+    except FileNotFoundError:
+        return None
 
 
-if __name__ == "__main__":
+# Command-line options: flag -> (dest, type, default); type None is a switch
+_OPTIONS = {
+    '--config': ('config', str, None),
+    '--base_folder': ('base_folder', str, None),
+    '--dry-run': ('dry_run', None, False),
+    '--sfreq': ('sfreq', float, 500.0),
+    '--general-limit': ('general_limit', float, 15.0),
+    '--transition-limit': ('transition_limit', float, 21.0),
+    '--limit': ('limit', int, None),
+    '--output-dir': ('output_dir', str, None),
+    '--force': ('force', None, False),
+}
+
+
+def build_parser():
+    """Builds the argparse parser (used for --help and error reporting)."""
+    import argparse
+    
     parser = argparse.ArgumentParser(
         description='Forward-fill Adaptive_CurrentAdaptiveState for all sessions'
     )
@@ -55,17 +73,59 @@ if __name__ == "__main__":
     parser.add_argument('--force', action='store_true',
                        help='Force reprocessing even if already processed')
     
-    args = parser.parse_args()
+    return parser
+
+
+def parse_args(argv=None):
+    """
+    Parse command-line arguments without importing argparse on the common path.
+    
+    Falls back to the full argparse parser for --help, unknown options,
+    abbreviations or malformed values, so usage and errors look the same.
+    """
+    if argv is None:
+        argv = sys.argv[1:]
+    
+    values = {dest: default for dest, _, default in _OPTIONS.values()}
+    try:
+        i = 0
+        while i < len(argv):
+            flag, has_value, value = argv[i].partition('=')
+            dest, arg_type, _ = _OPTIONS[flag]
+            if arg_type is None:
+                if has_value:
+                    raise ValueError(argv[i])
+                values[dest] = True
+            else:
+                if not has_value:
+                    i += 1
+                    value = argv[i]
+                    if value.startswith('--'):
+                        raise ValueError(value)
+                values[dest] = arg_type(value)
+            i += 1
+    except (KeyError, IndexError, ValueError):
+        return build_parser().parse_args(argv)
     
-    # Load config if provided
+    return SimpleNamespace(**values)
+
+
+def main(argv=None):
+    """Resolves the session_reports folder and runs the original forward-fill script."""
+    args = parse_args(argv)
+    
+    # Load config only when it is needed to resolve base_folder
     main_config = None
     base_folder = args.base_folder
     
-    if args.config or base_folder is None:
+    if base_folder is not None:
+        if args.config:
+            print(f"Using --base_folder {base_folder} (not loading {args.config})")
+    else:
         config_path = args.config if args.config else None
         main_config = load_main_config(config_path)
         
-        if main_config and base_folder is None:
+        if main_config:
             # Use selected base_data_dir for forward-fill
             use_base_data_dir = main_config.get('use_base_data_dir', 'base_data_dir')
             if use_base_data_dir == 'base_data_dir':
@@ -83,34 +143,30 @@ if __name__ == "__main__":
                 print(f"Using base folder from config: {base_folder}")
             else:
                 print("base_data_dir not found in config")
-        elif base_folder is None:
+        else:
             print("Config file not found and no base_folder provided")
     
     # Import and call main function
-    from preprocess_forward_fill_states import main
-    
-    # Build sys.argv for the original script
-    import sys as sys_module
-    script_args = []
+    from preprocess_forward_fill_states import main as original_main
     
-    if base_folder:
-        script_args.append(base_folder)
-    
-    if args.dry_run:
-        script_args.append('--dry-run')
-    if args.sfreq != 500.0:
-        script_args.extend(['--sfreq', str(args.sfreq)])
-    if args.general_limit != 15.0:
-        script_args.extend(['--general-limit', str(args.general_limit)])
-    if args.transition_limit != 21.0:
-        script_args.extend(['--transition-limit', str(args.transition_limit)])
-    if args.limit:
-        script_args.extend(['--limit', str(args.limit)])
-    if args.output_dir:
-        script_args.extend(['--output-dir', args.output_dir])
-    if args.force:
-        script_args.append('--force')
+    # Build sys.argv for the original script, passing only non-default options
+    script_args = [base_folder] if base_folder else []
+    script_args += [flag for flag, enabled in (('--dry-run', args.dry_run),
+                                               ('--force', args.force)) if enabled]
+    for flag, value in (('--sfreq', args.sfreq),
+                        ('--general-limit', args.general_limit),
+                        ('--transition-limit', args.transition_limit),
+                        ('--limit', args.limit or None),
+                        ('--output-dir', args.output_dir or None)):
+        if value is not None and value != _OPTIONS[flag][2]:
+            # repr() is the shortest string that round-trips to the same float
+            script_args += (flag, repr(value) if isinstance(value, float) else str(value))
     
     # Set sys.argv for the original script
-    sys_module.argv = ['run_forward_fill.py'] + script_args
-    main()
+    with patched_argv(script_args, 'run_forward_fill.py'):
+        original_main()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -9,27 +9,34 @@ for state0 and state1 using Welch's method.
 import sys
 import os
 import argparse
+from functools import partial
+from pathlib import Path
 
-# Add original code directory to path
-original_code_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), '..', 'code')
-if os.path.exists(original_code_dir):
-    sys.path.insert(0, original_code_dir)
+# Add the original code directory to path
+import _bootstrap
 
-# Import the main function from the original script
-from processing_freq_band.calculate_frequency_bands import main as original_main, load_config
+from _yaml_cache import load_yaml_cached
+from _patch import patched_attrs, patched_argv
 
-def load_config_updated(config_path=None):
+# Get the configs directory
+CONFIG_DIR = Path(__file__).resolve().parent.parent / 'configs'
+
+def load_config_updated(config_path=None, fallback=None):
     """Loads config from configs/ directory."""
     if config_path is None:
         # Look for config in the new configs/ directory
-        script_dir = os.path.dirname(os.path.dirname(__file__))
-        config_path = os.path.join(script_dir, 'configs', 'freq_bands.yaml')
+        config_path = CONFIG_DIR / 'freq_bands.yaml'
     
-    # Use the original load_config function
-    return load_config(config_path)
+    try:
+        return load_yaml_cached(config_path)
+    except FileNotFoundError:
+        # Let the original loader handle missing files
+        if fallback is None:
+            from processing_freq_band.calculate_frequency_bands import load_config as fallback
+        return fallback(os.fspath(config_path))
 
 
-def main():
+def main(argv=None):
     """Main entrypoint."""
     parser = argparse.ArgumentParser(
         description='Calculate frequency band power (delta, theta, beta, gamma, tuned-gamma) for state0 and state1'
@@ -52,25 +59,26 @@ def main():
                        default=None,
                        help='Length of each epoch in seconds (overrides config)')
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     
     # Set default config path if not provided
     if args.config is None:
-        script_dir = os.path.dirname(os.path.dirname(__file__))
-        args.config = os.path.join(script_dir, 'configs', 'freq_bands.yaml')
+        args.config = str(CONFIG_DIR / 'freq_bands.yaml')
+    
+    # Import the original script's functions (deferred so --help and
+    # plain imports of this module skip numpy/pandas/matplotlib); the
+    # originals are passed to the *_updated loaders as the fallback for
+    # missing files, since the module attributes are patched below
+    from processing_freq_band.calculate_frequency_bands import main as original_main, load_config
     
     # Temporarily monkey-patch load_config to use our updated version
     import processing_freq_band.calculate_frequency_bands as calc_module
-    original_load_config = calc_module.load_config
-    calc_module.load_config = load_config_updated
     
-    try:
+    with patched_argv(argv, __file__), patched_attrs(calc_module, load_config=partial(load_config_updated, fallback=load_config)):
         # Call the original main function
         original_main()
-    finally:
-        # Restore original function
-        calc_module.load_config = original_load_config
+    return 0
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
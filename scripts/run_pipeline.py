@@ -13,23 +13,103 @@ Usage:
 
 import sys
 import os
+import re
+import io
+import json
+import time
+import atexit
+import hashlib
 import argparse
+import threading
+import functools
+import importlib
+import traceback
 import subprocess
-import yaml
 import tempfile
 import shutil
 from pathlib import Path
-from copy import deepcopy
+from collections import deque
+from concurrent.futures import (ThreadPoolExecutor, ProcessPoolExecutor,
+                                FIRST_COMPLETED, wait)
+
+import yaml
+
+from _yaml_cache import parse_yaml, parse_yaml_source, scan_yaml_source, dump_yaml
 
 # Get the scripts directory
 SCRIPTS_DIR = Path(__file__).parent
 PROJECT_ROOT = SCRIPTS_DIR.parent
 
+# Run each step in its own interpreter instead of importing it in-process
+# (also enabled by --isolated)
+RUN_IN_SUBPROCESS = os.environ.get('RCS_PIPELINE_SUBPROCESS', '') not in ('', '0')
+
+# Candidate lists at least this long are stat'ed concurrently
+STAT_BATCH_THRESHOLD = 32
+
+# Analysis step -> steps that must finish first (when they are selected)
+ANALYSIS_DEPENDENCIES = {
+    'forward_fill': set(),
+    'preprocessing': {'forward_fill'},
+    'freq_bands': {'preprocessing'},
+    'coherence': {'preprocessing'},
+    'slow_waves': {'preprocessing'},
+    'transitions': {'preprocessing'},
+    'analyze_transitions': {'preprocessing'},
+}
+
+# Pipeline step -> script in scripts/ that implements it (called as main(argv))
+STEPS = {
+    'forward_fill': 'run_forward_fill.py',
+    'preprocessing': 'run_preprocessing.py',
+    'freq_bands': 'run_freq_bands.py',
+    'coherence': 'run_coherence.py',
+    'slow_waves': 'run_slow_waves.py',
+    'transitions': 'run_transitions.py',
+    'analyze_transitions': 'analyze_transitions.py',
+    'plot_freq_bands': 'plot_freq_bands.py',
+    'plot_slow_waves': 'plot_slow_waves.py',
+    'plot_transitions': 'plot_transitions.py',
+    'plot_coherence': 'plot_coherence.py',
+    'plot_psd': 'plot_psd.py',
+}
+
+# Default for --jobs: half the CPUs, since each analysis is itself heavy
+DEFAULT_JOBS = max(1, (os.cpu_count() or 2) // 2)
+
+# Temporary configs unused for this long are removed when a run starts
+TEMP_CONFIG_MAX_AGE_SEC = 24 * 60 * 60
+
+# Placeholders as they appear in config source text: {name}
+_PLACEHOLDER_PATTERN = re.compile(r'\{([A-Za-z_][A-Za-z0-9_]*)\}')
+
+# Values made only of these characters can be spliced into a single- or
+# double-quoted YAML scalar without changing how it parses (plain scalars
+# are excluded: there the result can resolve to an int, bool, etc.)
+_YAML_INERT_VALUE = re.compile(r'[\w./~+-]*')
+
+# Placeholder positions per config source, see _placeholder_spans()
+_placeholder_spans_cache = {}
+
+# Config source bytes keyed on (resolved path, mtime_ns)
+_raw_yaml_cache = {}
+
+# Idle long-lived plot workers (see _plot_worker.py) as (process, ack file)
+_idle_plot_workers = []
+_plot_workers_lock = threading.Lock()
+
+# Parsed configs keyed on source bytes or text; entries are shared, so callers must
+# not mutate them in place
+_parsed_yaml_cache = {}
+
 
 def get_selected_base_data_dir(main_config):
     """
     Get the selected base data directory based on use_base_data_dir parameter.
     
+    The result is cached in main_config['_selected_base_data_dir'], so the
+    selection is resolved once per config.
+    
     Args:
         main_config: Main config dictionary
         
@@ -39,15 +119,19 @@ def get_selected_base_data_dir(main_config):
     if not main_config:
         return ''
     
-    use_base_data_dir = main_config.get('use_base_data_dir', 'base_data_dir')
+    if '_selected_base_data_dir' not in main_config:
+        use_base_data_dir = main_config.get('use_base_data_dir', 'base_data_dir')
+        
+        if use_base_data_dir == 'base_data_dir':
+            selected = main_config.get('base_data_dir', '')
+        elif use_base_data_dir == 'base_data_dir_sleep_profiler':
+            selected = main_config.get('base_data_dir_sleep_profiler', '')
+        else:
+            # Custom path provided
+            selected = use_base_data_dir
+        main_config['_selected_base_data_dir'] = selected
     
-    if use_base_data_dir == 'base_data_dir':
-        return main_config.get('base_data_dir', '')
-    elif use_base_data_dir == 'base_data_dir_sleep_profiler':
-        return main_config.get('base_data_dir_sleep_profiler', '')
-    else:
-        # Custom path provided
-        return use_base_data_dir
+    return main_config['_selected_base_data_dir']
 
 
 def get_default_results_dir(main_config):
@@ -55,16 +139,7 @@ def get_default_results_dir(main_config):
     if not main_config:
         return str(PROJECT_ROOT / 'results')
     
-    # Determine which base_data_dir to use
-    use_base_data_dir = main_config.get('use_base_data_dir', 'base_data_dir')
-    
-    if use_base_data_dir == 'base_data_dir':
-        selected_base_data_dir = main_config.get('base_data_dir', '')
-    elif use_base_data_dir == 'base_data_dir_sleep_profiler':
-        selected_base_data_dir = main_config.get('base_data_dir_sleep_profiler', '')
-    else:
-        # Custom path provided
-        selected_base_data_dir = use_base_data_dir
+    selected_base_data_dir = get_selected_base_data_dir(main_config)
     
     if selected_base_data_dir:
         return str(Path(selected_base_data_dir) / 'results')
@@ -72,6 +147,62 @@ def get_default_results_dir(main_config):
         return str(PROJECT_ROOT / 'results')
 
 
+def _batched_mtimes(paths):
+    """
+    Return st_mtime for each path (None if it no longer exists).
+    
+    Larger batches are stat'ed from a small thread pool so the syscalls
+    overlap, which matters on network filesystems.
+    """
+    def mtime(path):
+        try:
+            return os.stat(path).st_mtime
+        except FileNotFoundError:
+            return None
+    
+    if len(paths) < STAT_BATCH_THRESHOLD:
+        return [mtime(path) for path in paths]
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        return list(executor.map(mtime, paths))
+
+
+def _pick_latest(dir_path, *predicates):
+    """
+    Scan a directory once and return the newest entry matching the first
+    predicate that has any match.
+    
+    Args:
+        dir_path: Directory to scan
+        *predicates: Filename predicates, in order of preference
+        
+    Returns:
+        Path of the most recently modified match as string, or None
+    """
+    matches = [[] for _ in predicates]
+    try:
+        with os.scandir(dir_path) as it:
+            for entry in it:
+                name = entry.name
+                if name.startswith('.'):
+                    continue
+                for i, predicate in enumerate(predicates):
+                    if predicate(name):
+                        matches[i].append(entry.path)
+                        break
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+    
+    # Only the preferred class with matches needs its mtimes
+    for paths in matches:
+        if not paths:
+            continue
+        candidates = [(mtime, path) for mtime, path in zip(_batched_mtimes(paths), paths)
+                      if mtime is not None]
+        if candidates:
+            return max(candidates, key=lambda c: c[0])[1]
+    return None
+
+
 def auto_detect_plot_input(plot_type, main_config):
     """
     Auto-detect plot input files based on plot type and main_config.
@@ -92,67 +223,74 @@ def auto_detect_plot_input(plot_type, main_config):
     patient_results_dir = results_base / patient_id
     
     if plot_type == 'freq_bands':
-        # Look for frequency_bands_analysis files in freq_bands directory
-        # Prefer CSV files (especially linear) since they don't require fastexcel
-        freq_bands_dir = patient_results_dir / 'freq_bands'
-        if freq_bands_dir.exists():
-            # Try linear CSV first (preferred format)
-            csv_linear_file = freq_bands_dir / 'frequency_bands_analysis_linear.csv'
-            if csv_linear_file.exists():
-                return str(csv_linear_file)
-            # Try regular CSV
-            csv_file = freq_bands_dir / 'frequency_bands_analysis.csv'
-            if csv_file.exists():
-                return str(csv_file)
-            # Fall back to Excel if CSV not available (requires fastexcel)
-            xlsx_file = freq_bands_dir / 'frequency_bands_analysis.xlsx'
-            if xlsx_file.exists():
-                return str(xlsx_file)
+        # Prefer CSV files (especially linear) since they don't require fastexcel;
+        # fall back to Excel if CSV not available
+        return _pick_latest(
+            patient_results_dir / 'freq_bands',
+            lambda name: name == 'frequency_bands_analysis_linear.csv',
+            lambda name: name == 'frequency_bands_analysis.csv',
+            lambda name: name == 'frequency_bands_analysis.xlsx',
+        )
     
     elif plot_type == 'psd':
-        # Look for PSD files (*_psd.json or *_psd.csv) in freq_bands directory
-        freq_bands_dir = patient_results_dir / 'freq_bands'
-        if freq_bands_dir.exists():
-            # Try JSON first
-            json_files = list(freq_bands_dir.glob('*_psd.json'))
-            if json_files:
-                # Return most recent
-                return str(max(json_files, key=lambda p: p.stat().st_mtime))
-            # Try CSV
-            csv_files = list(freq_bands_dir.glob('*_psd.csv'))
-            if csv_files:
-                # Return most recent
-                return str(max(csv_files, key=lambda p: p.stat().st_mtime))
-            # Also check for psd_data.csv
-            psd_file = freq_bands_dir / 'psd_data.csv'
-            if psd_file.exists():
-                return str(psd_file)
+        # Most recent *_psd.json, then most recent *_psd.csv, then psd_data.csv
+        return _pick_latest(
+            patient_results_dir / 'freq_bands',
+            lambda name: name.endswith('_psd.json'),
+            lambda name: name.endswith('_psd.csv'),
+            lambda name: name == 'psd_data.csv',
+        )
     
     elif plot_type == 'slow_waves':
-        # Look for slow wave metrics parquet files
-        slow_waves_dir = patient_results_dir / 'slow_waves'
-        if slow_waves_dir.exists():
-            parquet_files = list(slow_waves_dir.glob('*metrics*.parquet'))
-            if parquet_files:
-                # Return most recent
-                return str(max(parquet_files, key=lambda p: p.stat().st_mtime))
+        # Most recent slow wave metrics parquet file
+        return _pick_latest(
+            patient_results_dir / 'slow_waves',
+            lambda name: name.endswith('.parquet') and 'metrics' in name[:-len('.parquet')],
+        )
     
     elif plot_type == 'coherence':
-        # Look for coherence parquet files
-        coherence_dir = patient_results_dir / 'coherence'
-        if coherence_dir.exists():
-            parquet_files = list(coherence_dir.glob('coherence*.parquet'))
-            if parquet_files:
-                # Return most recent
-                return str(max(parquet_files, key=lambda p: p.stat().st_mtime))
+        # Most recent coherence parquet file
+        return _pick_latest(
+            patient_results_dir / 'coherence',
+            lambda name: name.startswith('coherence') and name.endswith('.parquet'),
+        )
     
     return None
 
 
+class _SafeDict(dict):
+    """Mapping for str.format_map that leaves unknown placeholders untouched."""
+    
+    def __missing__(self, key):
+        return '{' + key + '}'
+
+
+@functools.lru_cache(maxsize=8)
+def _compile_substitutions(items):
+    """
+    Build the lookup structures for a substitutions set.
+    
+    Args:
+        items: frozenset of (placeholder, value) pairs
+        
+    Returns:
+        Tuple of (_SafeDict for str.format_map, compiled regex matching every
+        '{placeholder}', dict mapping '{placeholder}' -> value)
+    """
+    value_map = {f"{{{key}}}": value for key, value in items}
+    pattern = re.compile('|'.join(re.escape(token) for token in value_map))
+    return _SafeDict(items), pattern, value_map
+
+
 def substitute_placeholders(text, substitutions):
     """
     Substitute placeholders in text with actual values.
     
+    Plain '{name}' placeholders go through str.format_map in one C-level
+    pass. Text that format syntax would misread (format specs, conversions,
+    indexing, stray or doubled braces) is handled by an exact-match regex
+    instead, so it is only ever changed where a known placeholder appears.
+    
     Args:
         text: String that may contain placeholders like {patient_id}
         substitutions: Dictionary of placeholder -> value mappings
@@ -160,90 +298,285 @@ def substitute_placeholders(text, substitutions):
     Returns:
         String with placeholders replaced
     """
-    if isinstance(text, str):
-        for key, value in substitutions.items():
-            text = text.replace(f"{{{key}}}", str(value))
-    return text
+    if not (isinstance(text, str) and substitutions and '{' in text):
+        return text
+    return _substitute_text(text, _lookup_for(substitutions))
+
+
+def _lookup_for(substitutions):
+    """Returns the cached _compile_substitutions() result for a substitutions dict."""
+    return _compile_substitutions(
+        frozenset((key, str(value)) for key, value in substitutions.items()))
+
+
+def _substitute_text(text, lookup):
+    """Replaces known placeholders in a string that contains '{'."""
+    mapping, pattern, value_map = lookup
+    
+    if ':' not in text and '!' not in text and '[' not in text \
+            and '{{' not in text and '}}' not in text:
+        try:
+            return text.format_map(mapping)
+        except (ValueError, IndexError, KeyError, AttributeError, TypeError):
+            pass
+    
+    return pattern.sub(lambda m: value_map[m.group(0)], text)
+
+
+def _iter_items(node):
+    """Returns an iterator of (key, value) pairs for a dict or list."""
+    return iter(node.items()) if isinstance(node, dict) else enumerate(node)
+
+
+def _set_copied(frame, key, value):
+    """Sets frame's container[key], shallow-copying the container on first write."""
+    if frame[2] is None:
+        frame[2] = dict(frame[0]) if isinstance(frame[0], dict) else list(frame[0])
+    frame[2][key] = value
 
 
 def substitute_in_dict(data, substitutions):
-    """Recursively replaces placeholders in dict/list structures."""
-    if isinstance(data, dict):
-        return {k: substitute_in_dict(v, substitutions) for k, v in data.items()}
-    elif isinstance(data, list):
-        return [substitute_in_dict(item, substitutions) for item in data]
-    elif isinstance(data, str):
+    """Replaces placeholders in dict/list structures.
+    
+    Walks the tree with an explicit stack. A container is copied only when
+    something beneath it changes, so placeholder-free branches are returned
+    as-is and the input is never modified.
+    """
+    if not isinstance(data, (dict, list)):
         return substitute_placeholders(data, substitutions)
-    else:
+    if not substitutions:
         return data
+    
+    # Resolve the lookup once per walk rather than once per string
+    lookup = _lookup_for(substitutions)
+    
+    # Frame: [container, items iterator, copy (or None), key in parent]
+    stack = deque([[data, _iter_items(data), None, None]])
+    while True:
+        frame = stack[-1]
+        for key, value in frame[1]:
+            if isinstance(value, (dict, list)):
+                stack.append([value, _iter_items(value), None, key])
+                break
+            if isinstance(value, str) and '{' in value:
+                new_value = _substitute_text(value, lookup)
+                if new_value != value:
+                    _set_copied(frame, key, new_value)
+        else:
+            # Container done: hand the (possibly copied) result to its parent
+            stack.pop()
+            result = frame[0] if frame[2] is None else frame[2]
+            if not stack:
+                return result
+            if result is not frame[0]:
+                _set_copied(stack[-1], frame[3], result)
+
+
+def _read_config_bytes(config_path):
+    """Returns the config file's raw bytes, re-reading only if it changed on disk."""
+    key = (config_path.resolve(), config_path.stat().st_mtime_ns)
+    if key not in _raw_yaml_cache:
+        _raw_yaml_cache[key] = config_path.read_bytes()
+    return _raw_yaml_cache[key]
+
 
+def _parse_config_bytes(source):
+    """Parses config source (bytes or text), reusing the result for identical input."""
+    if source not in _parsed_yaml_cache:
+        _parsed_yaml_cache[source] = parse_yaml_source(source)
+    return _parsed_yaml_cache[source]
 
-def load_and_substitute_config(config_path, main_config):
-    """Loads config file and replaces placeholders ({patient_id}, {base_data_dir}, etc.) with values from main_config."""
-    with open(config_path, 'r') as f:
-        config = yaml.safe_load(f)
+
+def _placeholder_spans(source):
+    """
+    Locate the placeholders in config source bytes by where they sit in the YAML.
     
-    # Determine which base_data_dir to use based on use_base_data_dir parameter
-    use_base_data_dir = main_config.get('use_base_data_dir', 'base_data_dir')
+    Only placeholders inside a quoted value scalar can be substituted in the
+    text with the same result as substituting after parsing. Placeholders in
+    comments are never substituted.
     
-    if use_base_data_dir == 'base_data_dir':
-        selected_base_data_dir = main_config.get('base_data_dir', '')
-    elif use_base_data_dir == 'base_data_dir_sleep_profiler':
-        selected_base_data_dir = main_config.get('base_data_dir_sleep_profiler', '')
-    else:
-        # Custom path provided
-        selected_base_data_dir = use_base_data_dir
+    Args:
+        source: Config source bytes
+        
+    Returns:
+        Tuple of (decoded source text, list of (start, end, name) for
+        placeholders inside quoted value scalars, set of placeholder names
+        that appear anywhere else outside comments: plain scalars, keys,
+        flow collections), or None if the source cannot be scanned
+    """
+    if source in _placeholder_spans_cache:
+        return _placeholder_spans_cache[source]
     
-    # Create substitutions dictionary
+    result = None
+    try:
+        text = source.decode('utf-8')
+        tokens = scan_yaml_source(text)
+    except Exception:
+        tokens = None
+    
+    if tokens is not None:
+        # Character ranges of quoted value scalars and of every other token
+        quoted, other = [], []
+        is_key = False
+        for token in tokens:
+            start, end = token.start_mark.index, token.end_mark.index
+            if isinstance(token, yaml.ScalarToken) and token.style in ("'", '"') and not is_key:
+                quoted.append((start, end))
+            elif end > start:
+                other.append((start, end))
+            is_key = isinstance(token, yaml.KeyToken)
+        
+        spans, unsafe_names = [], set()
+        for match in _PLACEHOLDER_PATTERN.finditer(text):
+            start, end = match.span()
+            if any(s < start and end < e for s, e in quoted):
+                spans.append((start, end, match.group(1)))
+            elif any(s < end and start < e for s, e in other):
+                unsafe_names.add(match.group(1))
+            # Otherwise the placeholder is in a comment
+        result = (text, spans, unsafe_names)
+    
+    _placeholder_spans_cache[source] = result
+    return result
+
+
+def _substitute_quoted(source, substitutions):
+    """
+    Substitute placeholders in the source text of a config, if that is safe.
+    
+    Args:
+        source: Config source bytes
+        substitutions: Placeholder mapping from _build_substitutions()
+        
+    Returns:
+        Substituted source text, or None if placeholders must be substituted
+        after parsing instead
+    """
+    if not all(_YAML_INERT_VALUE.fullmatch(str(value)) for value in substitutions.values()):
+        return None
+    
+    located = _placeholder_spans(source)
+    if located is None:
+        return None
+    text, spans, unsafe_names = located
+    if not unsafe_names.isdisjoint(substitutions):
+        return None
+    
+    parts, position = [], 0
+    for start, end, name in spans:
+        if name in substitutions:
+            parts.append(text[position:start])
+            parts.append(str(substitutions[name]))
+            position = end
+    parts.append(text[position:])
+    return ''.join(parts)
+
+
+def _resolve_model_path(main_config):
+    """
+    Auto-construct main_config['model_path'] if not set.
+    
+    Uses the most recent ClusterClassificationModel_* directory under
+    {model_base_dir}/{model_subdir_pattern}/{patient_id}. The model path is
+    optional (only needed for sleep scoring analyses), so nothing is
+    reported when it cannot be found.
+    """
+    if main_config.get('model_path'):
+        return
+    
+    model_base = main_config.get('model_base_dir', '')
+    model_subdir = main_config.get('model_subdir_pattern', '')
+    patient_id = main_config.get('patient_id', '')
+    if model_base and model_subdir and patient_id:
+        # Most recent ClusterClassificationModel directory, in one scan
+        model_dir = Path(model_base) / model_subdir / patient_id
+        latest_model = _pick_latest(
+            model_dir, lambda name: name.startswith('ClusterClassificationModel_'))
+        if latest_model:
+            main_config['model_path'] = latest_model
+            print(f"   Auto-detected model path: {main_config['model_path']}")
+
+
+def _build_substitutions(main_config):
+    """
+    Build the placeholder -> value mapping used for all step configs.
+    
+    Args:
+        main_config: Finalized main config dictionary
+        
+    Returns:
+        Dictionary of placeholder -> value mappings
+    """
     substitutions = {
         'patient_id': main_config.get('patient_id', ''),
         'hemisphere': main_config.get('hemisphere', ''),
-        'base_data_dir': selected_base_data_dir,  # Use selected base directory
+        'base_data_dir': get_selected_base_data_dir(main_config),  # Use selected base directory
         'base_data_dir_sleep_profiler': main_config.get('base_data_dir_sleep_profiler', ''),
         'results_dir': main_config.get('results_dir', get_default_results_dir(main_config)),
         'model_base_dir': main_config.get('model_base_dir', ''),
         'model_subdir_pattern': main_config.get('model_subdir_pattern', ''),
     }
     
-    # Auto-construct model_path if not set
-    # Model path is optional - only needed for sleep scoring analyses
-    if not main_config.get('model_path'):
-        model_base = main_config.get('model_base_dir', '')
-        model_subdir = main_config.get('model_subdir_pattern', '')
-        patient_id = main_config.get('patient_id', '')
-        if model_base and model_subdir and patient_id:
-            # Try to find the model directory
-            model_dir = Path(model_base) / model_subdir / patient_id
-            if model_dir.exists():
-                # Look for ClusterClassificationModel directories
-                model_dirs = list(model_dir.glob('ClusterClassificationModel_*'))
-                if model_dirs:
-                    # Use the most recent one (by modification time)
-                    latest_model = max(model_dirs, key=lambda p: p.stat().st_mtime)
-                    main_config['model_path'] = str(latest_model)
-                    print(f"   Auto-detected model path: {main_config['model_path']}")
-                # Don't warn if model directory exists but no models found - it's optional
-            # Don't warn if model directory doesn't exist - it's optional for most analyses
-    
     # Add model_path to substitutions if it exists
     if main_config.get('model_path'):
         substitutions['model_path'] = main_config['model_path']
     
-    # Apply substitutions
-    config = substitute_in_dict(config, substitutions)
+    return substitutions
+
+
+def _deep_merge(dst, src):
+    """
+    Recursively merge dict src into dict dst, in place.
+    
+    Nested dicts of dst are copied before being merged into, so only dst
+    itself is modified. Non-dict values in src replace those in dst.
+    """
+    pending = deque([(dst, src)])
+    while pending:
+        dst_node, src_node = pending.popleft()
+        for key, value in src_node.items():
+            if isinstance(value, dict) and isinstance(dst_node.get(key), dict):
+                merged = dict(dst_node[key])
+                dst_node[key] = merged
+                pending.append((merged, value))
+            else:
+                dst_node[key] = value
+
+
+def load_and_substitute_config(config_path, substitutions, config_overrides=None):
+    """
+    Loads config file and replaces placeholders ({patient_id}, {base_data_dir}, etc.).
+    
+    Args:
+        config_path: Path to the step config file
+        substitutions: Placeholder mapping from _build_substitutions()
+        config_overrides: main_config['config_overrides'], keyed by config file stem
+        
+    Returns:
+        Substituted config dictionary
+    """
+    source = _read_config_bytes(config_path)
+    
+    # Placeholders that all sit in quoted value scalars are substituted in the
+    # source text, which is then parsed once (and cached per substituted text)
+    substituted = _substitute_quoted(source, substitutions)
+    if substituted is not None:
+        config = _parse_config_bytes(substituted)
+    else:
+        # Otherwise substitute after parsing, like the parsed values would be
+        # (copies only the branches that contain placeholders, so the cached
+        # tree itself is never modified)
+        config = substitute_in_dict(_parse_config_bytes(source), substitutions)
     
     # Apply overrides from main_config if they exist
     config_name = config_path.stem
-    if 'config_overrides' in main_config and config_name in main_config['config_overrides']:
-        overrides = main_config['config_overrides'][config_name]
+    if config_overrides and config_name in config_overrides:
+        overrides = config_overrides[config_name]
         # Skip if overrides is None or empty
-        if overrides is not None:
-            # Recursively update config with overrides
-            for key, value in overrides.items():
-                if isinstance(value, dict) and key in config and isinstance(config[key], dict):
-                    config[key].update(value)
-                else:
-                    config[key] = substitute_in_dict(value, substitutions)
+        if overrides:
+            # Merge into a copy; the parsed config is cached and shared
+            config = dict(config)
+            _deep_merge(config, substitute_in_dict(overrides, substitutions))
     
     return config
 
@@ -252,6 +585,10 @@ def write_temp_config(config_dict, original_config_path):
     """
     Write a config dictionary to a temporary file.
     
+    The file name includes a hash of the serialized config, and an existing
+    file is only rewritten if its bytes differ, so an identical config (from
+    this run or an earlier one) reuses the existing file.
+    
     Args:
         config_dict: Config dictionary to write
         original_config_path: Original config path (for naming)
@@ -262,26 +599,190 @@ def write_temp_config(config_dict, original_config_path):
     temp_dir = PROJECT_ROOT / 'temp_configs'
     temp_dir.mkdir(exist_ok=True)
     
-    temp_file = temp_dir / f"{original_config_path.stem}_temp.yaml"
+    buf = io.StringIO()
+    dump_yaml(config_dict, buf)
+    data = buf.getvalue().encode()
+    key = hashlib.blake2b(data).hexdigest()[:16]
+    temp_file = temp_dir / f"{original_config_path.stem}_{key}.yaml"
+    
+    try:
+        if temp_file.read_bytes() == data:
+            # Refresh the mtime so the age-based cleanup treats it as recently used
+            os.utime(temp_file)
+            return temp_file
+    except FileNotFoundError:
+        pass
     
-    with open(temp_file, 'w') as f:
-        yaml.dump(config_dict, f, default_flow_style=False, sort_keys=False)
+    # Write to a scratch file and rename, so a partial write is never reused
+    scratch_file = temp_file.with_name(f"{temp_file.name}.{os.getpid()}.tmp")
+    scratch_file.write_bytes(data)
+    os.replace(scratch_file, temp_file)
     
     return temp_file
 
 
+def purge_temp_configs(max_age_sec=TEMP_CONFIG_MAX_AGE_SEC):
+    """
+    Remove temporary config files not used within max_age_sec.
+    
+    Returns:
+        Number of files removed
+    """
+    temp_dir = PROJECT_ROOT / 'temp_configs'
+    cutoff = time.time() - max_age_sec
+    removed = 0
+    try:
+        with os.scandir(temp_dir) as it:
+            for entry in it:
+                if entry.is_file() and entry.stat().st_mtime < cutoff:
+                    try:
+                        os.remove(entry.path)
+                        removed += 1
+                    except FileNotFoundError:
+                        pass
+    except FileNotFoundError:
+        pass
+    return removed
+
+
+def _run_subprocess(script_path, args):
+    """Runs a script in a fresh interpreter. Returns the exit code."""
+    cmd = [sys.executable, str(script_path)]
+    if args:
+        cmd.extend(args)
+    
+    # Set unbuffered mode for real-time output
+    env = os.environ.copy()
+    env['PYTHONUNBUFFERED'] = '1'
+    
+    # The child inherits our stdout/stderr and writes to them directly;
+    # flush first so our own output stays in order
+    sys.stdout.flush()
+    sys.stderr.flush()
+    return subprocess.run(cmd, cwd=PROJECT_ROOT, env=env, check=False).returncode
+
+
+def _start_plot_worker():
+    """Starts a _plot_worker.py process. Returns (process, ack file)."""
+    read_fd, write_fd = os.pipe()
+    env = os.environ.copy()
+    env['PYTHONUNBUFFERED'] = '1'
+    try:
+        process = subprocess.Popen(
+            [sys.executable, str(SCRIPTS_DIR / '_plot_worker.py'), str(write_fd)],
+            stdin=subprocess.PIPE, cwd=PROJECT_ROOT, env=env,
+            pass_fds=(write_fd,), text=True)
+    except BaseException:
+        os.close(read_fd)
+        raise
+    finally:
+        os.close(write_fd)
+    return process, os.fdopen(read_fd, 'r')
+
+
+def _stop_plot_worker(worker):
+    """Closes a plot worker's stdin (which makes it exit) and waits for it."""
+    process, ack = worker
+    try:
+        process.stdin.close()
+    except OSError:
+        pass
+    process.wait()
+    ack.close()
+
+
+@atexit.register
+def _stop_plot_workers():
+    with _plot_workers_lock:
+        workers = list(_idle_plot_workers)
+        _idle_plot_workers.clear()
+    for worker in workers:
+        _stop_plot_worker(worker)
+
+
+def _run_in_plot_worker(script_path, args):
+    """
+    Runs a plot script in a long-lived worker process, reusing an idle one
+    if available. If the worker dies, the script is run in a fresh
+    interpreter instead. Returns the exit code.
+    """
+    with _plot_workers_lock:
+        worker = _idle_plot_workers.pop() if _idle_plot_workers else None
+    if worker is None:
+        worker = _start_plot_worker()
+    process, ack = worker
+    
+    command = {'script': script_path.stem, 'args': [str(a) for a in args or []]}
+    sys.stdout.flush()
+    sys.stderr.flush()
+    try:
+        process.stdin.write(json.dumps(command) + '\n')
+        process.stdin.flush()
+        reply = ack.readline()
+    except OSError:
+        reply = ''
+    
+    if not reply:
+        print(f"⚠️  Plot worker exited unexpectedly, running {script_path.name} on its own")
+        _stop_plot_worker(worker)
+        return _run_subprocess(script_path, args)
+    
+    with _plot_workers_lock:
+        _idle_plot_workers.append(worker)
+    return int(reply)
+
+
+def _run_in_process(script_path, args):
+    """
+    Imports a script as a module and calls its main(argv) in this interpreter.
+    
+    Scripts without a main() are run in a subprocess instead.
+    
+    Returns:
+        Exit code (0 on success)
+    """
+    module = importlib.import_module(script_path.stem)
+    if not hasattr(module, 'main'):
+        return _run_subprocess(script_path, args)
+    
+    # Scripts expect to run from the project root, as they do in a subprocess
+    cwd = os.getcwd()
+    os.chdir(PROJECT_ROOT)
+    try:
+        returncode = module.main(list(args or []))
+    except SystemExit as e:
+        returncode = e.code
+    except Exception:
+        traceback.print_exc()
+        returncode = 1
+    finally:
+        os.chdir(cwd)
+        sys.stdout.flush()
+        sys.stderr.flush()
+    
+    if returncode is None:
+        return 0
+    if not isinstance(returncode, int):
+        # sys.exit('message') prints the message and exits with status 1
+        print(returncode, file=sys.stderr)
+        return 1
+    return returncode
+
+
 def run_script(script_name, args=None, use_temp_config=False):
-    """Runs a script from scripts/ directory. Returns True if successful."""
+    """
+    Runs a script from scripts/ directory. Returns True if successful.
+    
+    Scripts run in-process by default; pass --isolated (or set
+    RCS_PIPELINE_SUBPROCESS=1) to run each one in its own interpreter instead.
+    In that mode plot scripts run in reusable worker processes.
+    """
     script_path = SCRIPTS_DIR / script_name
     
     if not script_path.exists():
         print(f"❌ Script not found: {script_path}")
         return False
     
-    cmd = [sys.executable, str(script_path)]
-    if args:
-        cmd.extend(args)
-    
     print(f"\n{'='*60}")
     print(f"Running: {script_name}")
     if args:
@@ -289,28 +790,14 @@ def run_script(script_name, args=None, use_temp_config=False):
     print(f"{'='*60}\n")
     
     try:
-        # Use Popen for real-time output streaming
-        # Set unbuffered mode for real-time output
-        import os
-        env = os.environ.copy()
-        env['PYTHONUNBUFFERED'] = '1'
-        
-        process = subprocess.Popen(cmd, cwd=PROJECT_ROOT, 
-                                 stdout=subprocess.PIPE, 
-                                 stderr=subprocess.STDOUT,  # Combine stderr with stdout
-                                 text=True, bufsize=1,
-                                 env=env)
-        
-        # Stream output in real-time line by line
-        while True:
-            output = process.stdout.readline()
-            if output == '' and process.poll() is not None:
-                break
-            if output:
-                print(output, end='')
-        
-        # Get return code
-        returncode = process.poll()
+        if RUN_IN_SUBPROCESS and script_path.stem.startswith('plot_') and os.name == 'posix':
+            # Plot scripts share warm worker processes instead of each
+            # paying the matplotlib/pandas import cost
+            returncode = _run_in_plot_worker(script_path, args)
+        elif RUN_IN_SUBPROCESS:
+            returncode = _run_subprocess(script_path, args)
+        else:
+            returncode = _run_in_process(script_path, args)
         success = returncode == 0
         
         if success:
@@ -318,11 +805,9 @@ def run_script(script_name, args=None, use_temp_config=False):
         else:
             print(f"\n❌ {script_name} failed with exit code {returncode}")
         
-        # Clean up temp configs if requested
+        # Clean up stale temp configs if requested
         if use_temp_config:
-            temp_dir = PROJECT_ROOT / 'temp_configs'
-            if temp_dir.exists():
-                shutil.rmtree(temp_dir)
+            purge_temp_configs()
         
         return success
     except Exception as e:
@@ -330,6 +815,114 @@ def run_script(script_name, args=None, use_temp_config=False):
         return False
 
 
+def copy_session_types_file(main_config):
+    """
+    Copy session_types_analysis.csv from {selected_base_data_dir}/{patient_id}
+    into the patient's results/freq_bands directory (if missing or outdated).
+    """
+    patient_id = main_config.get('patient_id', '')
+    # Use selected base_data_dir
+    selected_base_data_dir = get_selected_base_data_dir(main_config)
+    results_dir = main_config.get('results_dir', get_default_results_dir(main_config))
+    
+    if patient_id and selected_base_data_dir:
+        # Source: selected_base_data_dir/{patient_id} directory
+        patient_dir = Path(selected_base_data_dir) / patient_id
+        source_file = patient_dir / 'session_types_analysis.csv'
+        
+        # Destination: results/freq_bands directory
+        results_base = Path(results_dir)
+        dest_dir = results_base / patient_id / 'freq_bands'
+        dest_file = dest_dir / 'session_types_analysis.csv'
+        
+        if source_file.exists() and not dest_file.exists():
+            dest_dir.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(source_file, dest_file)
+            print(f"   ✅ Copied session_types_analysis.csv to: {dest_file}")
+        elif source_file.exists() and dest_file.exists():
+            # Check if source is newer and update if needed
+            if source_file.stat().st_mtime > dest_file.stat().st_mtime:
+                shutil.copy2(source_file, dest_file)
+                print(f"   ✅ Updated session_types_analysis.csv in: {dest_file}")
+            else:
+                print(f"   ℹ️  session_types_analysis.csv already exists and is up-to-date: {dest_file}")
+        elif not source_file.exists():
+            print(f"   ⚠️  session_types_analysis.csv not found at: {source_file}")
+            print(f"      Searched in: {patient_dir}")
+            print(f"      Plots will not be able to distinguish continuous vs adaptive sessions")
+            print(f"      To fix: Run analyze_session_types.py to generate this file")
+
+
+def run_steps(steps, max_workers=1, on_success=None):
+    """
+    Run pipeline steps, starting each one once the selected steps it depends
+    on (see ANALYSIS_DEPENDENCIES) have finished.
+    
+    With max_workers > 1, independent steps run concurrently: in a process
+    pool when steps run in-process, or in a thread pool when each step is its
+    own subprocess anyway. Otherwise steps run one after another in pipeline
+    order. A step whose dependency failed is skipped and reported as failed.
+    
+    Args:
+        steps: Dict of step name -> (script_name, script_args), in pipeline order
+        max_workers: Maximum number of steps to run at once
+        on_success: Optional dict of step name -> callback run (in this
+            process) after that step succeeds
+        
+    Returns:
+        Dict of step name -> success, in the same order as steps
+    """
+    on_success = on_success or {}
+    results = {}
+    pending = dict(steps)
+    running = {}  # future -> step name
+    
+    executor = None
+    if max_workers > 1 and len(steps) > 1:
+        pool = ThreadPoolExecutor if RUN_IN_SUBPROCESS else ProcessPoolExecutor
+        executor = pool(max_workers=min(max_workers, len(steps)))
+    
+    def finish(name, success):
+        results[name] = success
+        if success and name in on_success:
+            on_success[name]()
+    
+    try:
+        while pending or running:
+            # Start every step whose selected dependencies are done
+            for name in list(pending):
+                deps = ANALYSIS_DEPENDENCIES.get(name, set()) & steps.keys()
+                if any(dep not in results for dep in deps):
+                    continue
+                script_name, script_args = pending.pop(name)
+                
+                failed_deps = [dep for dep in deps if not results[dep]]
+                if failed_deps:
+                    print(f"\n⚠️  Skipping {name}: {', '.join(failed_deps)} failed")
+                    results[name] = False
+                elif executor is None:
+                    finish(name, run_script(script_name, script_args))
+                else:
+                    running[executor.submit(run_script, script_name, script_args)] = name
+            
+            if running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        success = future.result()
+                    except Exception as e:
+                        # e.g. the worker process was killed
+                        print(f"\n❌ Error running {name}: {e}")
+                        success = False
+                    finish(name, success)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    
+    return {name: results[name] for name in steps}
+
+
 def main():
     parser = argparse.ArgumentParser(
         description='RCS Sleep Pipeline Orchestrator',
@@ -395,16 +988,27 @@ Examples:
                        help='Input file for plot scripts')
     parser.add_argument('--output_dir', type=str,
                        help='Output directory for plots')
+    parser.add_argument('--jobs', type=int, default=DEFAULT_JOBS,
+                       help=f'Maximum number of independent analysis or plot steps to run '
+                            f'in parallel (default: {DEFAULT_JOBS}; 1 runs them sequentially)')
+    parser.add_argument('--isolated', action='store_true',
+                       help='Run each step in its own Python interpreter instead of '
+                            'in-process (same as RCS_PIPELINE_SUBPROCESS=1)')
     
     args = parser.parse_args()
     
+    if args.isolated:
+        # Also export it so worker processes started with spawn see it
+        global RUN_IN_SUBPROCESS
+        RUN_IN_SUBPROCESS = True
+        os.environ['RCS_PIPELINE_SUBPROCESS'] = '1'
+    
     # Load main config if provided
     main_config = {}
     if args.config:
         config_path = PROJECT_ROOT / args.config if not Path(args.config).is_absolute() else Path(args.config)
         if config_path.exists():
-            with open(config_path, 'r') as f:
-                main_config = yaml.safe_load(f)
+            main_config = parse_yaml(config_path)
             print(f"✅ Loaded main config from: {config_path}")
             
             # Override patient_id if provided via command line
@@ -436,24 +1040,18 @@ Examples:
                 results_base = Path(main_config['results_dir'])
                 patient_results_dir = results_base / patient_id
                 
-                # Create directory structure
-                patient_results_dir.mkdir(parents=True, exist_ok=True)
+                plots_dir = patient_results_dir / 'plots'
                 
                 # Create subdirectories for different analysis types (CSV/results)
-                (patient_results_dir / 'freq_bands').mkdir(exist_ok=True)
-                (patient_results_dir / 'coherence').mkdir(exist_ok=True)
-                (patient_results_dir / 'slow_waves').mkdir(exist_ok=True)
-                (patient_results_dir / 'transitions').mkdir(exist_ok=True)
-                (patient_results_dir / 'lfp_transitions').mkdir(exist_ok=True)
+                # and organized plot subdirectories; parents are created as needed
+                dirs = [patient_results_dir / name for name in (
+                    'freq_bands', 'coherence', 'slow_waves', 'transitions', 'lfp_transitions')]
+                dirs += [plots_dir / name for name in (
+                    'freq_bands', 'psd', 'coherence', 'slow_waves', 'transitions')]
                 
-                # Create organized plot subdirectories
-                plots_dir = patient_results_dir / 'plots'
-                plots_dir.mkdir(exist_ok=True)
-                (plots_dir / 'freq_bands').mkdir(exist_ok=True)
-                (plots_dir / 'psd').mkdir(exist_ok=True)
-                (plots_dir / 'coherence').mkdir(exist_ok=True)
-                (plots_dir / 'slow_waves').mkdir(exist_ok=True)
-                (plots_dir / 'transitions').mkdir(exist_ok=True)
+                # Overlap the mkdir round-trips (noticeable on network filesystems)
+                with ThreadPoolExecutor(max_workers=8) as executor:
+                    list(executor.map(lambda d: d.mkdir(parents=True, exist_ok=True), dirs))
                 
                 print(f"   Results will be saved to: {patient_results_dir}")
                 print(f"   CSV files: {patient_results_dir}/<analysis_type>/")
@@ -463,25 +1061,8 @@ Examples:
                 if not main_config.get('plot_output_dir'):
                     main_config['plot_output_dir'] = str(plots_dir)
                 
-                # Auto-construct model_path if not set
-                # Only show warnings if model is actually needed (e.g., for sleep scoring)
-                # For freq_bands analysis, model_path is optional
-                if not main_config.get('model_path'):
-                    model_base = main_config.get('model_base_dir', '')
-                    model_subdir = main_config.get('model_subdir_pattern', '')
-                    if model_base and model_subdir and patient_id:
-                        # Try to find the model directory
-                        model_dir = Path(model_base) / model_subdir / patient_id
-                        if model_dir.exists():
-                            # Look for ClusterClassificationModel directories
-                            model_dirs = list(model_dir.glob('ClusterClassificationModel_*'))
-                            if model_dirs:
-                                # Use the most recent one (by modification time)
-                                latest_model = max(model_dirs, key=lambda p: p.stat().st_mtime)
-                                main_config['model_path'] = str(latest_model)
-                                print(f"   Auto-detected model path: {main_config['model_path']}")
-                            # Don't warn if model directory exists but no models found - it's optional
-                        # Don't warn if model directory doesn't exist - it's optional for most analyses
+                # Auto-construct model_path if not set (optional for most analyses)
+                _resolve_model_path(main_config)
         else:
             print(f"⚠️  Config file not found: {config_path}")
             print("   Continuing without main config...")
@@ -554,9 +1135,21 @@ Examples:
         return
     
     results = {}
-    temp_configs = []  # Track temp config files for cleanup
     
-    # Run analysis steps (forward_fill should run before preprocessing)
+    # Clean up stale temp configs; recent ones are kept so identical configs
+    # can be reused by this run and the next
+    removed = purge_temp_configs()
+    if removed:
+        print(f"🧹 Cleaned up {removed} stale temporary config file(s)")
+    
+    # Placeholder values are fixed once main_config is finalized
+    if main_config:
+        substitutions = _build_substitutions(main_config)
+        config_overrides = main_config.get('config_overrides')
+    
+    # Collect analysis steps (script + args) in pipeline order; they are run
+    # below according to ANALYSIS_DEPENDENCIES
+    analysis_steps = {}
     if args.forward_fill:
         script_args = []
         # Pass config path to forward_fill script if available
@@ -567,7 +1160,7 @@ Examples:
             default_config = PROJECT_ROOT / 'configs' / 'pipeline_main.yaml'
             if default_config.exists():
                 script_args.extend(['--config', str(default_config)])
-        results['forward_fill'] = run_script('run_forward_fill.py', script_args)
+        analysis_steps['forward_fill'] = (STEPS['forward_fill'], script_args)
     
     if args.preprocessing:
         script_args = []
@@ -579,7 +1172,7 @@ Examples:
             default_config = PROJECT_ROOT / 'configs' / 'pipeline_main.yaml'
             if default_config.exists():
                 script_args.extend(['--config', str(default_config)])
-        results['preprocessing'] = run_script('run_preprocessing.py', script_args)
+        analysis_steps['preprocessing'] = (STEPS['preprocessing'], script_args)
     
     if args.freq_bands:
         script_args = []
@@ -587,92 +1180,59 @@ Examples:
         
         # Apply substitutions if main_config is available
         if main_config and config_path.exists():
-            config = load_and_substitute_config(config_path, main_config)
+            config = load_and_substitute_config(config_path, substitutions, config_overrides)
             temp_config = write_temp_config(config, config_path)
-            temp_configs.append(temp_config)
             script_args.extend(['--config', str(temp_config)])
         elif not args.config:
             # Use default config
             script_args.extend(['--config', str(config_path)])
         
-        results['freq_bands'] = run_script('run_freq_bands.py', script_args)
-        
-        # After freq_bands analysis completes, copy session_types_analysis.csv to results directory
-        # so it's available for plotting
-        if results['freq_bands'] and main_config:
-            patient_id = main_config.get('patient_id', '')
-            # Use selected base_data_dir
-            use_base_data_dir = main_config.get('use_base_data_dir', 'base_data_dir')
-            if use_base_data_dir == 'base_data_dir':
-                selected_base_data_dir = main_config.get('base_data_dir', '')
-            elif use_base_data_dir == 'base_data_dir_sleep_profiler':
-                selected_base_data_dir = main_config.get('base_data_dir_sleep_profiler', '')
-            else:
-                selected_base_data_dir = use_base_data_dir
-            results_dir = main_config.get('results_dir', get_default_results_dir(main_config))
-            
-            if patient_id and selected_base_data_dir:
-                # Source: selected_base_data_dir/{patient_id} directory
-                patient_dir = Path(selected_base_data_dir) / patient_id
-                source_file = patient_dir / 'session_types_analysis.csv'
-                
-                # Destination: results/freq_bands directory
-                results_base = Path(results_dir)
-                dest_dir = results_base / patient_id / 'freq_bands'
-                dest_file = dest_dir / 'session_types_analysis.csv'
-                
-                if source_file.exists() and not dest_file.exists():
-                    dest_dir.mkdir(parents=True, exist_ok=True)
-                    shutil.copy2(source_file, dest_file)
-                    print(f"   ✅ Copied session_types_analysis.csv to: {dest_file}")
-                elif source_file.exists() and dest_file.exists():
-                    # Check if source is newer and update if needed
-                    if source_file.stat().st_mtime > dest_file.stat().st_mtime:
-                        shutil.copy2(source_file, dest_file)
-                        print(f"   ✅ Updated session_types_analysis.csv in: {dest_file}")
-                    else:
-                        print(f"   ℹ️  session_types_analysis.csv already exists and is up-to-date: {dest_file}")
-                elif not source_file.exists():
-                    print(f"   ⚠️  session_types_analysis.csv not found at: {source_file}")
-                    print(f"      Searched in: {patient_dir}")
-                    print(f"      Plots will not be able to distinguish continuous vs adaptive sessions")
-                    print(f"      To fix: Run analyze_session_types.py to generate this file")
+        analysis_steps['freq_bands'] = (STEPS['freq_bands'], script_args)
     
     if args.coherence:
-        results['coherence'] = run_script('run_coherence.py')
+        analysis_steps['coherence'] = (STEPS['coherence'], [])
     
     if args.slow_waves:
-        results['slow_waves'] = run_script('run_slow_waves.py')
+        analysis_steps['slow_waves'] = (STEPS['slow_waves'], [])
     
     if args.transitions:
         script_args = []
         config_path = PROJECT_ROOT / 'configs' / 'lfp_transition.yaml'
         
         if main_config and config_path.exists():
-            config = load_and_substitute_config(config_path, main_config)
+            config = load_and_substitute_config(config_path, substitutions, config_overrides)
             temp_config = write_temp_config(config, config_path)
-            temp_configs.append(temp_config)
             script_args.extend(['--config', str(temp_config)])
         elif not args.config:
             script_args.extend(['--config', str(config_path)])
         
-        results['transitions'] = run_script('run_transitions.py', script_args)
+        analysis_steps['transitions'] = (STEPS['transitions'], script_args)
     
     if args.analyze_transitions:
         script_args = []
         config_path = PROJECT_ROOT / 'configs' / 'transitions.yaml'
         
         if main_config and config_path.exists():
-            config = load_and_substitute_config(config_path, main_config)
+            config = load_and_substitute_config(config_path, substitutions, config_overrides)
             temp_config = write_temp_config(config, config_path)
-            temp_configs.append(temp_config)
             script_args.extend(['--config', str(temp_config)])
         elif not args.config:
             script_args.extend(['--config', str(config_path)])
         
-        results['analyze_transitions'] = run_script('analyze_transitions.py', script_args)
+        analysis_steps['analyze_transitions'] = (STEPS['analyze_transitions'], script_args)
+    
+    # After freq_bands analysis completes, copy session_types_analysis.csv to
+    # results directory so it's available for plotting
+    on_success = {}
+    if main_config:
+        on_success['freq_bands'] = lambda: copy_session_types_file(main_config)
+    
+    results.update(run_steps(analysis_steps, args.jobs, on_success))
+    
+    # Collect plot steps; they have no dependencies on each other, so they
+    # run concurrently (up to --jobs at a time) once the analyses are done
+    plot_steps = {}
     
-    # Run plot steps
     if args.plot_freq_bands:
         input_file = args.input_file
         if not input_file and main_config and 'plot_inputs' in main_config:
@@ -716,7 +1276,7 @@ Examples:
                 # Use plots/freq_bands subdirectory
                 output_dir = str(Path(base_plots_dir) / 'freq_bands')
                 script_args.extend(['--output_dir', output_dir])
-            results['plot_freq_bands'] = run_script('plot_freq_bands.py', script_args)
+            plot_steps['plot_freq_bands'] = (STEPS['plot_freq_bands'], script_args)
     
     if args.plot_slow_waves:
         input_file = args.input_file
@@ -741,7 +1301,7 @@ Examples:
             if args.output_dir or (main_config and main_config.get('plot_output_dir')):
                 output_dir = args.output_dir or main_config.get('plot_output_dir')
                 script_args.extend(['--output_dir', output_dir])
-            results['plot_slow_waves'] = run_script('plot_slow_waves.py', script_args)
+            plot_steps['plot_slow_waves'] = (STEPS['plot_slow_waves'], script_args)
     
     if args.plot_transitions:
         script_args = []
@@ -750,7 +1310,7 @@ Examples:
             # Use plots/transitions subdirectory
             output_dir = str(Path(base_plots_dir) / 'transitions')
             script_args.extend(['--output_dir', output_dir])
-        results['plot_transitions'] = run_script('plot_transitions.py', script_args)
+        plot_steps['plot_transitions'] = (STEPS['plot_transitions'], script_args)
     
     if args.plot_coherence:
         input_file = args.input_file
@@ -773,7 +1333,7 @@ Examples:
                 # Use plots/coherence subdirectory
                 output_dir = str(Path(base_plots_dir) / 'coherence')
                 script_args.extend(['--output_dir', output_dir])
-            results['plot_coherence'] = run_script('plot_coherence.py', script_args)
+            plot_steps['plot_coherence'] = (STEPS['plot_coherence'], script_args)
     
     if args.plot_psd:
         input_file = args.input_file
@@ -800,14 +1360,9 @@ Examples:
                 # Use plots/psd subdirectory
                 output_dir = str(Path(base_plots_dir) / 'psd')
                 script_args.extend(['--output_dir', output_dir])
-            results['plot_psd'] = run_script('plot_psd.py', script_args)
-    
-    # Clean up temp configs
-    if temp_configs:
-        temp_dir = PROJECT_ROOT / 'temp_configs'
-        if temp_dir.exists():
-            shutil.rmtree(temp_dir)
-            print(f"\n🧹 Cleaned up temporary config files")
+            plot_steps['plot_psd'] = (STEPS['plot_psd'], script_args)
+    
+    results.update(run_steps(plot_steps, args.jobs))
     
     # Print summary
     print(f"\n{'='*60}")
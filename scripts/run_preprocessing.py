@@ -8,32 +8,32 @@ Merges raw_data.parquet with sleep_data.parquet (no signal filtering).
 import sys
 import os
 import argparse
-import yaml
 from pathlib import Path
 
 # Add the original code directory to path
-original_code_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), '..', 'code')
-if os.path.exists(original_code_dir):
-    sys.path.insert(0, original_code_dir)
+import _bootstrap
+
+from _yaml_cache import parse_yaml
 
 # Get the scripts directory
-SCRIPTS_DIR = Path(__file__).parent
+SCRIPTS_DIR = Path(__file__).resolve().parent
 PROJECT_ROOT = SCRIPTS_DIR.parent
+CONFIG_DIR = PROJECT_ROOT / 'configs'
 
 
 def load_main_config(config_path=None):
     """Loads pipeline_main.yaml config."""
     if config_path is None:
-        config_path = PROJECT_ROOT / 'configs' / 'pipeline_main.yaml'
+        config_path = CONFIG_DIR / 'pipeline_main.yaml'
     
-    if os.path.exists(config_path):
-        with open(config_path, 'r') as f:
-            return yaml.safe_load(f)
-    return None
+    try:
+        return parse_yaml(config_path)
+    except FileNotFoundError:
+        return None
 
 
-# Import and run the original script's main function
-if __name__ == "__main__":
+def main(argv=None):
+    """Resolves the base folder and runs the original preprocessing script."""
     parser = argparse.ArgumentParser(
         description='Preprocess sleep study data by merging raw_data.parquet with sleep_data.parquet'
     )
@@ -44,33 +44,42 @@ if __name__ == "__main__":
     parser.add_argument('--patient', nargs='+', required=False,
                        help='Process only these patient(s) (e.g., --patient RCS16L RCS16R)')
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     
-    # Load config if provided
+    # Load config only when it is needed to resolve base_folder
     main_config = None
     base_folder = args.base_folder
     
-    if args.config or base_folder is None:
+    if base_folder is not None:
+        if args.config:
+            print(f"Using --base_folder {base_folder} (not loading {args.config})")
+    else:
         # Try to load config to get base_data_dir_sleep_profiler
         config_path = args.config if args.config else None
         main_config = load_main_config(config_path)
         
-        if main_config and base_folder is None:
+        if main_config:
             # Get base_data_dir_sleep_profiler from config
             base_folder = main_config.get('base_data_dir_sleep_profiler')
             if base_folder:
                 print(f"Using base_data_dir_sleep_profiler from config: {base_folder}")
             else:
                 print(f"base_data_dir_sleep_profiler not found in config, using default")
-        elif base_folder is None:
+        else:
             print(f"Config file not found, using default base folder")
     
-    from pre_processing.pre_processing_forSleepProfiler import main
+    # Import and run the original script's main function
+    from pre_processing.pre_processing_forSleepProfiler import main as original_main
     
     if args.patient:
         if len(args.patient) == 1:
-            main(patient_filter=args.patient[0], base_folder=base_folder)
+            original_main(patient_filter=args.patient[0], base_folder=base_folder)
         else:
-            main(patient_filter=args.patient, base_folder=base_folder)
+            original_main(patient_filter=args.patient, base_folder=base_folder)
     else:
-        main(base_folder=base_folder)
+        original_main(base_folder=base_folder)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
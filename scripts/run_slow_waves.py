@@ -10,11 +10,20 @@ import os
 import argparse
 
 # Add the original code directory to path
-original_code_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), '..', 'code')
-if os.path.exists(original_code_dir):
-    sys.path.insert(0, original_code_dir)
+import _bootstrap
 
-if __name__ == "__main__":
-    from processing_SW.process_overnight_waves_Hanna import main
+from _patch import patched_argv
+
+
+def main(argv=None):
+    """Imports and runs the original script's main function."""
+    from processing_SW.process_overnight_waves_Hanna import main as original_main
+    
     # The original script has its own argument parsing
-    main()
+    with patched_argv(argv, __file__):
+        original_main()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
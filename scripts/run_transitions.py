@@ -8,18 +8,24 @@ Analyzes LFP activity during sleep stage transitions.
 import sys
 import os
 import argparse
+from pathlib import Path
 
 # Add the original code directory to path
-original_code_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), '..', 'code')
-if os.path.exists(original_code_dir):
-    sys.path.insert(0, original_code_dir)
+import _bootstrap
 
-if __name__ == "__main__":
-    from process_transitions.sleepstage_transition.lfp_stage_transition_analysis import main
+from _patch import patched_argv
+
+# Get the configs directory
+CONFIG_DIR = Path(__file__).resolve().parent.parent / 'configs'
+
+
+def main(argv=None):
+    """Parses arguments and runs the original LFP transition analysis."""
+    from process_transitions.sleepstage_transition.lfp_stage_transition_analysis import main as original_main
     
     parser = argparse.ArgumentParser(description="Analyze LFP activity during sleep stage transitions")
     parser.add_argument("--config", 
-                       default=os.path.join(os.path.dirname(os.path.dirname(__file__)), 'configs', 'lfp_transition.yaml'),
+                       default=str(CONFIG_DIR / 'lfp_transition.yaml'),
                        help="Path to YAML configuration file")
     parser.add_argument("--data_folder", help="Folder containing parquet files to analyze")
     parser.add_argument("--data_file", help="Specific parquet file to analyze")
@@ -32,8 +38,13 @@ if __name__ == "__main__":
     parser.add_argument("--max_nan_ratio", type=float, default=0.5, help="Maximum ratio of NaN values to accept in segments (0.0-1.0)")
     parser.add_argument("--max_interpolation_duration", type=float, default=2.0, help="Maximum disconnection duration to interpolate (seconds)")
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     
-    import sys as sys_module
-    sys_module.argv = ['run_transitions.py'] + [f'--{k}={v}' for k, v in vars(args).items() if v is not None]
-    main()
+    script_args = [f'--{k}={v}' for k, v in vars(args).items() if v is not None]
+    with patched_argv(script_args, 'run_transitions.py'):
+        original_main()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,11 +8,37 @@ import os
 import logging
 import pandas as pd
 import polars as pl
+import pyarrow.parquet as pq
 
 logger = logging.getLogger(__name__)
 
 
-def read_parquet_fast(file_path, columns=None, use_polars=True):
+def read_parquet_batched(file_path, columns=None, batch_size=200_000):
+    """
+    Read a parquet file as a stream of pandas DataFrames.
+    
+    Batches are decoded one at a time, so peak memory stays around one batch
+    instead of the whole file plus its pandas copy.
+    
+    Args:
+        file_path (str): Path to parquet file
+        columns (list): Optional list of columns to read (recommended for large files)
+        batch_size (int): Maximum number of rows per DataFrame
+        
+    Yields:
+        pd.DataFrame: Consecutive row batches of the file
+    """
+    parquet_file = pq.ParquetFile(file_path)
+    try:
+        for batch in parquet_file.iter_batches(batch_size=batch_size, columns=columns):
+            # Release Arrow buffers as they are converted instead of holding both copies
+            yield batch.to_pandas(zero_copy_only=False, self_destruct=True)
+    finally:
+        parquet_file.close()
+
+
+def read_parquet_fast(file_path, columns=None, use_polars=True, as_iterator=False,
+                      return_type='pandas'):
     """
     Read parquet file efficiently, with option to use Polars for large files.
     
@@ -23,16 +49,30 @@ def read_parquet_fast(file_path, columns=None, use_polars=True):
         file_path (str): Path to parquet file
         columns (list): Optional list of columns to read (recommended for large files)
         use_polars (bool): If True, use Polars for memory efficiency. If False, use pandas.
+        as_iterator (bool): If True, return an iterator of pandas DataFrames (see
+            read_parquet_batched) so large files can be processed in chunks
+        return_type (str): 'pandas' (default), 'polars' to skip the pandas conversion,
+            or 'numpy' for a dict of column name -> array (for PSD/coherence code that
+            only needs arrays; these may be read-only views of Arrow memory).
+            'polars' and 'numpy' always read with Polars.
         
     Returns:
-        pd.DataFrame: DataFrame with parquet data (always returns pandas DataFrame)
+        pd.DataFrame, pl.DataFrame or dict: Parquet data in the requested form,
+            or an iterator of pandas DataFrames if as_iterator is True
     """
+    if return_type not in ('pandas', 'polars', 'numpy'):
+        raise ValueError(f"Unknown return_type: {return_type}")
+    
     if not os.path.exists(file_path):
         raise FileNotFoundError(f"File not found: {file_path}")
     
+    if as_iterator:
+        logger.info(f"Streaming parquet file: {os.path.basename(file_path)} (columns: {len(columns) if columns else 'all'})...")
+        return read_parquet_batched(file_path, columns=columns)
+    
     logger.info(f"Reading parquet file: {os.path.basename(file_path)} (columns: {len(columns) if columns else 'all'})...")
     
-    if use_polars:
+    if use_polars or return_type != 'pandas':
         try:
             # Use Polars for memory-efficient reading
             if columns:
@@ -40,17 +80,22 @@ def read_parquet_fast(file_path, columns=None, use_polars=True):
             else:
                 df_pl = pl.read_parquet(file_path)
             logger.info(f"Read completed: {len(df_pl):,} rows (using Polars)")
-            # Convert to pandas for compatibility with rest of code
-            return df_pl.to_pandas()
         except Exception as e:
+            if return_type != 'pandas':
+                raise
             logger.warning(f"Error reading with Polars, falling back to pandas: {e}")
             # Fall through to pandas
+        else:
+            if return_type == 'polars':
+                return df_pl
+            if return_type == 'numpy':
+                # Numeric columns without nulls are exported without copying
+                return {col: df_pl[col].to_numpy() for col in df_pl.columns}
+            # Convert to pandas for compatibility with rest of code
+            return df_pl.to_pandas()
     
     # Use pandas with PyArrow engine
-    try:
-        df = pd.read_parquet(file_path, columns=columns, engine='pyarrow')
-    except Exception:
-        df = pd.read_parquet(file_path, columns=columns, engine='auto')
+    df = pd.read_parquet(file_path, columns=columns, engine='pyarrow')
     logger.info(f"Read completed: {len(df):,} rows (using pandas)")
     return df
 
@@ -64,22 +109,16 @@ def load_lfp_data(file_path, channels=['TD_key0', 'TD_key2', 'TD_key3']):
         channels: List of channel names to load
         
     Returns:
-        pl.DataFrame: Polars DataFrame with DerivedTime and channel data, or None if error
+        pl.DataFrame: Polars DataFrame with DerivedTime and float32 channel data, or None if error
     """
     if not os.path.exists(file_path):
         logger.warning(f"File not found: {file_path}")
         return None
     
     try:
-        # First, check schema to see which channels are available (memory-efficient)
-        try:
-            df_schema = pl.scan_parquet(file_path)
-            available_columns = df_schema.columns
-        except Exception:
-            # Fallback: read a small sample to check columns
-            df_sample = pl.read_parquet(file_path, n_rows=1)
-            available_columns = df_sample.columns
-            del df_sample
+        # Check which channels are available from the parquet footer alone
+        # (no data pages are read)
+        available_columns = pq.read_schema(file_path).names
         
         # Check if channels exist
         available_channels = [ch for ch in channels if ch in available_columns]
@@ -87,28 +126,40 @@ def load_lfp_data(file_path, channels=['TD_key0', 'TD_key2', 'TD_key3']):
             logger.warning(f"None of the requested channels {channels} found in {file_path}")
             return None
         
-        # Select DerivedTime and available channels during read (memory-efficient)
-        cols_to_select = ['DerivedTime'] + available_channels
-        df_selected = pl.read_parquet(file_path, columns=cols_to_select)
-        
-        # Remove rows with NaN in DerivedTime or any channel
-        df_selected = df_selected.filter(
-            pl.col('DerivedTime').is_not_null()
-        )
-        
+        # Remove rows with NaN in DerivedTime or any channel, as a single predicate
+        # that Polars can push down into the parquet reader
+        cond = pl.col('DerivedTime').is_not_null()
         for ch in available_channels:
-            df_selected = df_selected.filter(pl.col(ch).is_not_null())
-        
-        # Sort by DerivedTime
-        df_selected = df_selected.sort('DerivedTime')
+            cond = cond & pl.col(ch).is_not_null()
         
-        return df_selected
+        # Select, filter and sort by DerivedTime in one streamed query; channels
+        # are stored as float32, which is ample for LFP and halves memory
+        cols_to_select = [pl.col('DerivedTime')] + [pl.col(ch).cast(pl.Float32) for ch in available_channels]
+        query = pl.scan_parquet(file_path).select(cols_to_select).filter(cond).sort('DerivedTime')
+        return _collect_streaming(query)
         
     except Exception as e:
         logger.error(f"Error loading LFP data from {file_path}: {e}")
         return None
 
 
+def _collect_streaming(query):
+    """
+    Collect a LazyFrame with Polars' streaming engine.
+    
+    Args:
+        query: Polars LazyFrame
+        
+    Returns:
+        pl.DataFrame: Collected result
+    """
+    try:
+        return query.collect(engine='streaming')
+    except TypeError:
+        # Polars releases before the engine= argument
+        return query.collect(streaming=True)
+
+
 def read_parquet_with_polars(file_path):
     """
     Read parquet file using Polars and return as Polars DataFrame.
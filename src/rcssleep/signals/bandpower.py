@@ -9,16 +9,115 @@ import numpy as np
 from scipy import signal
 import logging
 
+try:
+    import numba
+except ImportError:
+    numba = None
+
+from . import spectral
+from ..utils.disk_cache import disk_cache
+
 logger = logging.getLogger(__name__)
 
 
+def _band_power_slice(psd, i_lo, i_hi, df):
+    """
+    Integrate PSD bins [i_lo, i_hi) into band power.
+    
+    Args:
+        psd (np.array): 1-D power spectral density values
+        i_lo (int): First bin in the band
+        i_hi (int): One past the last bin in the band
+        df (float): Frequency resolution (bin width) in Hz
+        
+    Returns:
+        tuple: (band_power_linear, band_power_db)
+    """
+    # Sum PSD (power per Hz) over the band and convert to power (as float64,
+    # since the PSD itself may be float32)
+    band_power_linear = float(psd[i_lo:i_hi].sum()) * df
+    
+    # Convert to dB; zero power maps to -infinity instead of log(0)
+    if band_power_linear > 0:
+        band_power_db = 10 * np.log10(band_power_linear)
+    else:
+        band_power_db = -np.inf
+    
+    return band_power_linear, band_power_db
+
+
+if numba is not None:
+    # No 'ninf'/'nnan' fast-math flags: the dB value may legitimately be -inf
+    _band_power_slice = numba.njit(cache=True, fastmath={'reassoc', 'contract', 'arcp'})(
+        _band_power_slice)
+    
+    @numba.njit(cache=True, parallel=True)
+    def _band_power_slice_2d(psd_matrix, i_lo, i_hi, df):
+        """
+        Integrate PSD bins [i_lo, i_hi) into band power for every row of a PSD matrix.
+        
+        Args:
+            psd_matrix (np.array): 2-D PSD values, one row per epoch
+            i_lo (int): First bin in the band
+            i_hi (int): One past the last bin in the band
+            df (float): Frequency resolution (bin width) in Hz
+            
+        Returns:
+            tuple: (band_power_linear array, band_power_db array)
+        """
+        n_rows = psd_matrix.shape[0]
+        band_power_linear = np.empty(n_rows)
+        band_power_db = np.empty(n_rows)
+        for row in numba.prange(n_rows):
+            linear, db = _band_power_slice(psd_matrix[row], i_lo, i_hi, df)
+            band_power_linear[row] = linear
+            band_power_db[row] = db
+        return band_power_linear, band_power_db
+else:
+    def _band_power_slice_2d(psd_matrix, i_lo, i_hi, df):
+        """
+        Integrate PSD bins [i_lo, i_hi) into band power for every row of a PSD matrix.
+        
+        Args:
+            psd_matrix (np.array): 2-D PSD values, one row per epoch
+            i_lo (int): First bin in the band
+            i_hi (int): One past the last bin in the band
+            df (float): Frequency resolution (bin width) in Hz
+            
+        Returns:
+            tuple: (band_power_linear array, band_power_db array)
+        """
+        band_power_linear = psd_matrix[:, i_lo:i_hi].sum(axis=1) * df
+        band_power_db = np.full(band_power_linear.shape, -np.inf)
+        positive = band_power_linear > 0
+        band_power_db[positive] = 10 * np.log10(band_power_linear[positive])
+        return band_power_linear, band_power_db
+
+
+def _band_indices(freqs, fmin, fmax):
+    """
+    Find the bin range [i_lo, i_hi) of sorted frequencies within [fmin, fmax].
+    
+    Args:
+        freqs (np.array): Sorted frequency values
+        fmin (float): Minimum frequency in Hz
+        fmax (float): Maximum frequency in Hz
+        
+    Returns:
+        tuple: (i_lo, i_hi)
+    """
+    i_lo = int(np.searchsorted(freqs, fmin, side='left'))
+    i_hi = int(np.searchsorted(freqs, fmax, side='right'))
+    return i_lo, max(i_lo, i_hi)
+
+
 def calculate_band_power_from_psd(psd, freqs, fmin, fmax):
     """
     Calculate power in a frequency band by integrating PSD over the frequency range.
     
     Args:
-        psd (np.array): Power spectral density values
-        freqs (np.array): Frequency values corresponding to PSD
+        psd (np.array): Power spectral density values, or a 2-D array with one PSD per row
+        freqs (np.array): Frequency values corresponding to PSD (sorted ascending)
         fmin (float): Minimum frequency in Hz
         fmax (float): Maximum frequency in Hz
         
@@ -26,36 +125,193 @@ def calculate_band_power_from_psd(psd, freqs, fmin, fmax):
         tuple: (band_power_linear, band_power_db)
             - band_power_linear: Power in the specified frequency band (in linear units)
             - band_power_db: Power in the specified frequency band (in dB)
+            For a 2-D psd both are arrays with one value per row.
     """
-    # Find frequency indices within the band
-    freq_mask = (freqs >= fmin) & (freqs <= fmax)
+    # Find the contiguous range of frequency bins within the band
+    freqs = np.asarray(freqs)
+    i_lo, i_hi = _band_indices(freqs, fmin, fmax)
     
-    # Convert PSD (power per Hz) to power spectrum (power)
-    # Calculate frequency resolution (bin width)
+    # Calculate frequency resolution (bin width) to convert PSD (power per Hz) to power
     if len(freqs) > 1:
-        df = freqs[1] - freqs[0]  # Frequency resolution (bin width)
+        df = float(freqs[1] - freqs[0])  # Frequency resolution (bin width)
     else:
         df = 1.0  # Fallback if only one frequency point
     
-    # Convert PSD to power spectrum: power_spectrum = PSD * df
-    power_spectrum = psd * df
+    psd = np.ascontiguousarray(psd)
+    if psd.ndim == 2:
+        return _band_power_slice_2d(psd, i_lo, i_hi, df)
+    return _band_power_slice(psd, i_lo, i_hi, df)
+
+
+def calculate_all_band_powers(psd, freqs, bands):
+    """
+    Calculate power in several frequency bands from the same PSD in one pass.
     
-    # Integrate (sum) power spectrum values in the band
-    band_power_linear = np.sum(power_spectrum[freq_mask])
+    The PSD is cumulatively summed once and each band is the difference of two
+    cumulative sums, instead of traversing the PSD once per band.
     
-    # Convert to dB: 10 * log10(power)
-    # Handle zero or very small values to avoid log(0) or negative infinity
-    if band_power_linear > 0:
-        band_power_db = 10 * np.log10(band_power_linear)
+    Args:
+        psd (np.array): Power spectral density values, or a 2-D array with one PSD per row
+        freqs (np.array): Frequency values corresponding to PSD (sorted ascending)
+        bands (dict): Band name -> (fmin, fmax) in Hz. Bands may overlap
+        
+    Returns:
+        dict: Band name -> (band_power_linear, band_power_db), as returned by
+            calculate_band_power_from_psd for the same band
+    """
+    freqs = np.asarray(freqs)
+    psd = np.asarray(psd)
+    
+    if len(freqs) > 1:
+        df = float(freqs[1] - freqs[0])  # Frequency resolution (bin width)
     else:
-        # If power is zero or negative, return -infinity or a very small dB value
-        band_power_db = -np.inf
+        df = 1.0  # Fallback if only one frequency point
     
-    return band_power_linear, band_power_db
+    # Bin range of every band, looked up in one searchsorted call each
+    names = list(bands)
+    edges = np.array([bands[name] for name in names], dtype=float).reshape(-1, 2)
+    i_lo = np.searchsorted(freqs, edges[:, 0], side='left')
+    i_hi = np.maximum(np.searchsorted(freqs, edges[:, 1], side='right'), i_lo)
+    
+    # cumulative[..., i] is the sum of the first i bins
+    cumulative = np.zeros(psd.shape[:-1] + (psd.shape[-1] + 1,))
+    np.cumsum(psd, axis=-1, dtype=np.float64, out=cumulative[..., 1:])
+    band_power_linear = (cumulative[..., i_hi] - cumulative[..., i_lo]) * df
+    
+    # Convert to dB; zero power maps to -infinity instead of log(0)
+    band_power_db = np.full(band_power_linear.shape, -np.inf)
+    positive = band_power_linear > 0
+    band_power_db[positive] = 10 * np.log10(band_power_linear[positive])
+    
+    return {
+        name: (band_power_linear[..., k][()], band_power_db[..., k][()])
+        for k, name in enumerate(names)
+    }
+
+
+def _as_float32(data):
+    """
+    Convert real-valued data to float32 for spectral estimation.
+    
+    LFP quantization noise is far above float32 precision, and single precision
+    halves memory traffic and speeds up the FFTs. Other dtypes are returned as is.
+    
+    Args:
+        data (np.array): Time series data
+        
+    Returns:
+        np.array: float32 data (no copy if it already is float32)
+    """
+    data = np.asarray(data)
+    if data.dtype.kind in 'fiu':
+        return data.astype(np.float32, copy=False)
+    return data
+
+
+if numba is not None:
+    @numba.njit(cache=True)
+    def _has_nan(values):
+        """
+        Check a 1-D array for NaN, stopping at the first one found.
+        
+        Args:
+            values (np.array): 1-D float array
+            
+        Returns:
+            bool: True if any value is NaN
+        """
+        for value in values:
+            if value != value:
+                return True
+        return False
+    
+    @numba.njit(cache=True, parallel=True)
+    def _rows_with_nan(values):
+        """
+        Check which rows of a 2-D float array contain NaN, without allocating
+        a same-size boolean mask.
+        
+        Args:
+            values (np.array): 2-D float array
+            
+        Returns:
+            np.array: Boolean array with one entry per row
+        """
+        n_rows = values.shape[0]
+        has_nan = np.empty(n_rows, dtype=np.bool_)
+        for row in numba.prange(n_rows):
+            has_nan[row] = _has_nan(values[row])
+        return has_nan
+else:
+    def _has_nan(values):
+        """
+        Check a 1-D array for NaN.
+        
+        Args:
+            values (np.array): 1-D float array
+            
+        Returns:
+            bool: True if any value is NaN
+        """
+        return bool(np.isnan(values).any())
+    
+    def _rows_with_nan(values):
+        """
+        Check which rows of a 2-D float array contain NaN.
+        
+        Args:
+            values (np.array): 2-D float array
+            
+        Returns:
+            np.array: Boolean array with one entry per row
+        """
+        return np.isnan(values).any(axis=1)
+
+
+def _is_constant_rows(values):
+    """
+    Check which rows of a 2-D array hold a single repeated value.
+    
+    NaN entries compare equal to each other, matching np.unique.
+    
+    Args:
+        values (np.array): 2-D array (numeric or object)
+        
+    Returns:
+        np.array: Boolean array with one entry per row
+    """
+    first = values[:, :1]
+    same = values == first
+    if values.dtype.kind == 'f':
+        same |= np.isnan(values) & np.isnan(first)
+    return same.all(axis=1)
+
+
+@disk_cache('psd_v1')
+def _welch_epochs(epochs, fs, nperseg, noverlap, backend):
+    """
+    Calculate the Welch PSD of every row of an epoch matrix.
+    
+    Args:
+        epochs (np.array): 2-D float32 data, one row per epoch
+        fs (float): Sampling frequency in Hz
+        nperseg (int): Length of each segment for Welch's method
+        noverlap (int): Number of points to overlap between segments
+        backend (str): 'numpy' or 'cupy'
+        
+    Returns:
+        tuple: (frequencies, PSD array with one row per epoch)
+    """
+    xp = spectral.get_array_module(backend)
+    if xp is not np and spectral.is_supported(epochs, nperseg, noverlap):
+        # cuFFT plans are kept in CuPy's plan cache, so repeated calls reuse them
+        freqs, psd = spectral.welch_psd(xp.asarray(epochs), fs, nperseg, noverlap, xp=xp)
+        return freqs, xp.asnumpy(psd)
+    return calculate_welch_psd(epochs, fs, nperseg=nperseg, noverlap=noverlap)
 
 
 def calculate_psd_per_epoch(data, state_data, fs, epoch_sec=3.0, target_state=None, 
-                            nperseg=None, noverlap=None):
+                            nperseg=None, noverlap=None, backend='numpy'):
     """
     Calculate PSD for each epoch using Welch's method.
     Epochs containing state transitions are discarded.
@@ -69,9 +325,13 @@ def calculate_psd_per_epoch(data, state_data, fs, epoch_sec=3.0, target_state=No
         target_state (optional): If specified, only process epochs belonging to this state
         nperseg (optional): Length of each segment for Welch's method. If None, uses epoch_sec * fs
         noverlap (optional): Number of points to overlap between segments. If None, uses 50% overlap
+        backend (str): 'numpy' (default) or 'cupy' to run the FFTs on a GPU. The valid epochs
+            are uploaded once and the PSDs copied back; falls back to NumPy without CuPy
         
     Returns:
-        tuple: (frequencies, list of PSD arrays for each valid epoch)
+        tuple: (frequencies, float32 PSD array of shape (n_valid_epochs, n_freqs), one row
+            per valid epoch; rows iterate like the former list of PSD arrays).
+            Returns (None, []) if there are no valid epochs.
     """
     epoch_samples = int(epoch_sec * fs)  # Epoch size in samples
     
@@ -83,70 +343,47 @@ def calculate_psd_per_epoch(data, state_data, fs, epoch_sec=3.0, target_state=No
     if len(data) < epoch_samples:
         return None, []
     
-    # Divide data into non-overlapping epochs
+    # Divide data into non-overlapping epochs: one row per epoch
     n_epochs = len(data) // epoch_samples
-    psd_list = []
-    valid_epoch_indices = []
-    
-    for i in range(n_epochs):
-        epoch_start = i * epoch_samples
-        epoch_end = epoch_start + epoch_samples
-        
-        # Extract epoch data and states
-        epoch_data = data[epoch_start:epoch_end]
-        epoch_states = state_data[epoch_start:epoch_end]
-        
-        # Check if epoch contains a state transition (discard if it does)
-        unique_states = np.unique(epoch_states)
-        if len(unique_states) > 1:
-            # Epoch contains state transition - discard
-            continue
-        
-        # If target_state is specified, only process epochs belonging to that state
-        if target_state is not None:
-            if len(unique_states) == 0 or unique_states[0] != target_state:
-                # Epoch does not belong to target state - skip
-                continue
-        
-        # Check for NaN values
-        if np.any(np.isnan(epoch_data)):
-            continue
-        
-        # Calculate PSD for this epoch using Welch's method
-        try:
-            freqs, psd_epoch = signal.welch(
-                epoch_data, 
-                fs=fs, 
-                nperseg=nperseg,
-                noverlap=noverlap,
-                window='hann'
-            )
-            psd_list.append(psd_epoch)
-            valid_epoch_indices.append(i)
-        except Exception as e:
-            logger.warning(f"Error calculating PSD for epoch {i}: {e}")
-            continue
-    
-    if len(psd_list) == 0:
+    n_samples = n_epochs * epoch_samples
+    epochs = _as_float32(data)[:n_samples].reshape(n_epochs, epoch_samples)
+    epoch_states = np.asarray(state_data)[:n_samples].reshape(n_epochs, epoch_samples)
+    
+    # Discard epochs that contain a state transition
+    valid = _is_constant_rows(epoch_states)
+    
+    # If target_state is specified, only process epochs belonging to that state
+    if target_state is not None:
+        valid &= epoch_states[:, 0] == target_state
+    
+    # Discard epochs with NaN values
+    valid &= ~_rows_with_nan(epochs)
+    
+    if not valid.any():
         return None, []
     
-    # Return frequencies (same for all epochs) and list of PSD arrays
-    # Calculate frequencies once (they're the same for all epochs)
-    _, freqs = signal.welch(
-        np.zeros(epoch_samples),  # Dummy data just to get frequency array
-        fs=fs,
-        nperseg=nperseg,
-        noverlap=noverlap,
-        window='hann'
-    )
+    # Calculate PSD for all valid epochs at once using Welch's method (each row
+    # is handled independently); with RCS_CACHE_DIR set, reruns on the same
+    # epochs and parameters are served from the on-disk cache
+    try:
+        freqs, psd = _welch_epochs(epochs[valid], fs, nperseg, noverlap, backend)
+    except Exception as e:
+        logger.warning(f"Error calculating PSD for epochs: {e}")
+        return None, []
     
-    return freqs, psd_list
+    # Return frequencies (same for all epochs) and the PSD matrix as computed,
+    # so callers can use it directly without stacking rows again
+    return freqs, psd
 
 
 def calculate_welch_psd(data, fs, nperseg=None, noverlap=None, window='hann'):
     """
     Calculate power spectral density using Welch's method.
     
+    With the default Hann window the PSD is computed from a cached window and
+    frequency axis instead of going through signal.welch; results are the same.
+    Real-valued data is processed in float32, so the PSD is float32.
+    
     Args:
         data (np.array): Time series data
         fs (float): Sampling frequency in Hz
@@ -162,6 +399,10 @@ def calculate_welch_psd(data, fs, nperseg=None, noverlap=None, window='hann'):
     if noverlap is None:
         noverlap = nperseg // 2
     
+    data = _as_float32(data)
+    if isinstance(window, str) and window == 'hann' and spectral.is_supported(data, nperseg, noverlap):
+        return spectral.welch_psd(data, fs, nperseg, noverlap)
+    
     freqs, psd = signal.welch(
         data,
         fs=fs,
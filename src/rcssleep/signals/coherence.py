@@ -8,9 +8,59 @@ import numpy as np
 from scipy import signal
 import logging
 
+from . import spectral
+
 logger = logging.getLogger(__name__)
 
 
+def calculate_coherence_matrix(signals, fs, nperseg=2048, noverlap=None):
+    """
+    Calculate spectral coherence between every pair of channels using Welch's method.
+    
+    The windowed segment spectra and auto-PSD of each channel are computed once
+    and reused for all pairs, instead of once per pair as with signal.coherence.
+    
+    Args:
+        signals: 2-D array of shape (n_channels, n_samples)
+        fs: Sampling frequency in Hz
+        nperseg: Length of each segment for Welch's method (default: 2048)
+        noverlap: Number of points to overlap between segments. If None, uses 50% overlap.
+        
+    Returns:
+        tuple: (frequencies, coherence values of shape (n_channels, n_channels, n_freqs))
+    """
+    if noverlap is None:
+        noverlap = nperseg // 2
+    
+    signals = np.asarray(signals)
+    n_channels = signals.shape[0]
+    
+    if not spectral.is_supported(signals, nperseg, noverlap):
+        # Inputs the cached path does not cover: fall back to pairwise signal.coherence
+        freqs = None
+        coh = None
+        for a in range(n_channels):
+            for b in range(a, n_channels):
+                freqs, coh_ab = signal.coherence(signals[a], signals[b], fs=fs,
+                                                 nperseg=nperseg, noverlap=noverlap)
+                if coh is None:
+                    coh = np.empty((n_channels, n_channels, len(freqs)))
+                coh[a, b] = coh[b, a] = coh_ab
+        return freqs, coh
+    
+    # Segment spectra per channel: (n_channels, n_segments, n_freqs)
+    spectra = spectral.segment_spectra(signals, nperseg, noverlap)
+    n_segments = spectra.shape[1]
+    
+    # Auto-PSD per channel and cross-PSD per pair; the density scaling and
+    # one-sided doubling cancel in |Pxy|^2 / (Pxx * Pyy)
+    pxx = (spectra.real ** 2 + spectra.imag ** 2).mean(axis=1)
+    pxy = np.einsum('asf,bsf->abf', np.conj(spectra), spectra) / n_segments
+    coh = (pxy.real ** 2 + pxy.imag ** 2) / pxx[:, None, :] / pxx[None, :, :]
+    
+    return spectral.get_rfft_freqs(nperseg, fs), coh
+
+
 def calculate_coherence(x, y, fs, nperseg=2048, noverlap=None):
     """
     Calculate spectral coherence between two signals using Welch's method.
@@ -31,6 +81,12 @@ def calculate_coherence(x, y, fs, nperseg=2048, noverlap=None):
     if noverlap is None:
         noverlap = nperseg // 2
     
+    x = np.asarray(x)
+    y = np.asarray(y)
+    if x.ndim == 1 and x.shape == y.shape:
+        freqs, coh = calculate_coherence_matrix(np.stack([x, y]), fs, nperseg=nperseg, noverlap=noverlap)
+        return freqs, coh[0, 1]
+    
     freqs, coh = signal.coherence(x, y, fs=fs, nperseg=nperseg, noverlap=noverlap)
     
     return freqs, coh
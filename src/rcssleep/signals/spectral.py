@@ -0,0 +1,163 @@
+"""
+Shared Welch building blocks for RCS sleep pipeline.
+
+Provides cached Hann windows and frequency axes plus segment-wise FFTs, so
+PSD and coherence calculations avoid rebuilding the same window on every call.
+Results match scipy.signal.welch / csd with a Hann window, constant detrend,
+one-sided spectra and mean averaging.
+
+The segment FFT also runs on a GPU through CuPy when it is installed; see
+get_array_module.
+"""
+
+import os
+import functools
+import numpy as np
+import scipy.fft
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Threads for batched CPU FFTs (pocketfft splits the segments between them)
+FFT_WORKERS = os.cpu_count() or 1
+
+
+@functools.lru_cache(maxsize=None)
+def get_array_module(backend='numpy'):
+    """
+    Get the array module for a compute backend.
+
+    CuPy is optional: if backend='cupy' is requested but CuPy cannot be
+    imported, a warning is logged once and NumPy is used instead.
+
+    Args:
+        backend (str): 'numpy' or 'cupy'
+
+    Returns:
+        module: numpy or cupy
+    """
+    if backend == 'cupy':
+        try:
+            import cupy
+            return cupy
+        except ImportError:
+            logger.warning("CuPy is not available, falling back to NumPy for PSD calculation")
+    elif backend != 'numpy':
+        raise ValueError(f"Unknown backend: {backend}")
+    return np
+
+
+@functools.lru_cache(maxsize=32)
+def get_hann_and_norm(nperseg):
+    """
+    Get a periodic Hann window and its sum of squares, cached per length.
+
+    Args:
+        nperseg (int): Window length in samples
+
+    Returns:
+        tuple: (window, win_sum_sq)
+            - window: Read-only Hann window (same as signal.get_window('hann', nperseg))
+            - win_sum_sq: Sum of squared window values, used for density scaling
+    """
+    # Periodic (FFT-friendly) Hann window, as used by scipy.signal.welch
+    window = 0.5 - 0.5 * np.cos(2.0 * np.pi * np.arange(nperseg) / nperseg)
+    window.flags.writeable = False
+    return window, float(np.dot(window, window))
+
+
+@functools.lru_cache(maxsize=32)
+def get_rfft_freqs(nperseg, fs):
+    """
+    Get the one-sided frequency axis for a segment length, cached per (nperseg, fs).
+
+    Args:
+        nperseg (int): Segment length in samples
+        fs (float): Sampling frequency in Hz
+
+    Returns:
+        np.array: Read-only frequency values in Hz
+    """
+    freqs = np.fft.rfftfreq(nperseg, d=1.0 / fs)
+    freqs.flags.writeable = False
+    return freqs
+
+
+def is_supported(data, nperseg, noverlap):
+    """
+    Check whether the cached Welch path can handle the given input.
+
+    Other cases (complex data, segments longer than the data, invalid overlap)
+    should go through scipy.signal, which handles them with its own warnings.
+
+    Args:
+        data (np.array): Time series data (segments taken along the last axis)
+        nperseg (int): Segment length in samples
+        noverlap (int): Number of overlapping samples between segments
+
+    Returns:
+        bool: True if segment_spectra / welch_psd can be used
+    """
+    return (np.isrealobj(data) and data.size > 0
+            and 0 <= noverlap < nperseg <= data.shape[-1])
+
+
+def segment_spectra(data, nperseg, noverlap, xp=np):
+    """
+    Compute one-sided FFTs of detrended, Hann-windowed segments.
+
+    Args:
+        data (np.array): Time series data (segments taken along the last axis)
+        nperseg (int): Segment length in samples
+        noverlap (int): Number of overlapping samples between segments
+        xp (module): Array module that owns data (numpy or cupy)
+
+    Returns:
+        np.array: Complex spectra with shape (..., n_segments, nperseg // 2 + 1)
+    """
+    window, _ = get_hann_and_norm(nperseg)
+    window = window.astype(data.dtype, copy=False) if data.dtype.kind == 'f' else window
+    if xp is not np:
+        window = xp.asarray(window)
+    step = nperseg - noverlap
+    n_segments = (data.shape[-1] - noverlap) // step
+
+    segments = xp.lib.stride_tricks.sliding_window_view(data, nperseg, axis=-1)
+    segments = segments[..., ::step, :][..., :n_segments, :]
+
+    # Constant detrend, then window (this also makes a contiguous copy)
+    segments = segments - segments.mean(axis=-1, keepdims=True)
+    segments *= window
+    if xp is np:
+        return scipy.fft.rfft(segments, axis=-1, workers=FFT_WORKERS)
+    return xp.fft.rfft(segments, axis=-1)
+
+
+def welch_psd(data, fs, nperseg, noverlap, xp=np):
+    """
+    Calculate a one-sided PSD density using Welch's method with a cached Hann window.
+
+    Args:
+        data (np.array): Time series data (PSD taken along the last axis)
+        fs (float): Sampling frequency in Hz
+        nperseg (int): Segment length in samples
+        noverlap (int): Number of overlapping samples between segments
+        xp (module): Array module that owns data (numpy or cupy)
+
+    Returns:
+        tuple: (frequencies as a NumPy array, PSD values with shape (..., nperseg // 2 + 1)
+            on the same device as data)
+    """
+    _, win_sum_sq = get_hann_and_norm(nperseg)
+    spectra = segment_spectra(data, nperseg, noverlap, xp=xp)
+
+    psd = (spectra.real ** 2 + spectra.imag ** 2).mean(axis=-2)
+    psd *= 1.0 / (fs * win_sum_sq)
+
+    # One-sided spectrum: double everything except DC (and Nyquist for even nperseg)
+    if nperseg % 2:
+        psd[..., 1:] *= 2
+    else:
+        psd[..., 1:-1] *= 2
+
+    return get_rfft_freqs(nperseg, fs), psd
@@ -0,0 +1,162 @@
+"""
+On-disk cache for deterministic array computations in RCS sleep pipeline.
+
+The cache is off unless RCS_CACHE_DIR is set. Results are then stored as .npz
+files under that directory, keyed on a hash of the function's arguments, so a
+rerun with the same data and parameters skips the computation entirely.
+Hashing reads every argument array once, so the cache only pays off for
+computations that cost much more than that.
+
+Each namespace is kept under RCS_CACHE_MAX_BYTES (default: 1 GiB) by
+removing its least recently used entries.
+"""
+
+import os
+import hashlib
+import functools
+import tempfile
+import numpy as np
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 1 << 30
+
+
+def get_cache_dir():
+    """
+    Get the cache root directory.
+
+    Returns:
+        str: Cache directory from RCS_CACHE_DIR, or None if caching is disabled
+    """
+    return os.environ.get('RCS_CACHE_DIR') or None
+
+
+def get_max_bytes():
+    """
+    Get the size limit for each cache namespace.
+
+    Returns:
+        int: Limit in bytes, from RCS_CACHE_MAX_BYTES (default: DEFAULT_MAX_BYTES)
+    """
+    try:
+        return int(os.environ.get('RCS_CACHE_MAX_BYTES', DEFAULT_MAX_BYTES))
+    except ValueError:
+        logger.warning("Ignoring invalid RCS_CACHE_MAX_BYTES=%r", os.environ['RCS_CACHE_MAX_BYTES'])
+        return DEFAULT_MAX_BYTES
+
+
+def _evict(namespace_dir, max_bytes):
+    """
+    Remove the least recently used entries until the namespace fits in max_bytes.
+
+    Args:
+        namespace_dir (str): Namespace directory
+        max_bytes (int): Size limit in bytes
+    """
+    entries = []
+    with os.scandir(namespace_dir) as it:
+        for entry in it:
+            if entry.name.endswith('.npz'):
+                st = entry.stat()
+                entries.append((st.st_mtime, st.st_size, entry.path))
+
+    total = sum(size for _, size, _ in entries)
+    # Entries' mtimes are refreshed on every hit, so the oldest is the least recently used
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+
+
+def _hash_argument(digest, value):
+    """
+    Feed one argument into a hash, using the raw buffer for arrays.
+
+    Args:
+        digest: hashlib hash object
+        value: Argument value (array or value with a stable repr)
+    """
+    if isinstance(value, np.ndarray):
+        value = np.ascontiguousarray(value)
+        digest.update(f"ndarray:{value.dtype.str}:{value.shape}:".encode())
+        digest.update(memoryview(value).cast('B'))
+    else:
+        digest.update(f"{type(value).__name__}:{value!r};".encode())
+
+
+def disk_cache(namespace):
+    """
+    Cache a function's array results on disk.
+
+    The decorated function must return a tuple of NumPy arrays and depend only on
+    its arguments, which must be arrays or values with a stable repr. Bump the
+    namespace (e.g. 'psd_v1' -> 'psd_v2') whenever the computation changes.
+    Cache read or write errors are logged; the function's result is returned
+    either way. Does nothing unless RCS_CACHE_DIR is set.
+
+    Args:
+        namespace (str): Subdirectory and key prefix for this function's results
+
+    Returns:
+        Decorator
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            cache_dir = get_cache_dir()
+            if cache_dir is None:
+                return func(*args, **kwargs)
+
+            digest = hashlib.blake2b(digest_size=20)
+            digest.update(f"{namespace}:{func.__module__}.{func.__qualname__};".encode())
+            for value in args:
+                _hash_argument(digest, value)
+            for name in sorted(kwargs):
+                digest.update(f"{name}=".encode())
+                _hash_argument(digest, kwargs[name])
+
+            namespace_dir = os.path.join(cache_dir, namespace)
+            cache_file = os.path.join(namespace_dir, f"{digest.hexdigest()}.npz")
+
+            try:
+                with np.load(cache_file) as cached:
+                    result = tuple(cached[f"arr_{i}"] for i in range(len(cached.files)))
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                logger.warning("Ignoring unreadable cache entry %s: %s", cache_file, e)
+            else:
+                # Mark the entry as recently used for eviction
+                try:
+                    os.utime(cache_file)
+                except OSError:
+                    pass
+                return result
+
+            result = func(*args, **kwargs)
+
+            try:
+                os.makedirs(namespace_dir, exist_ok=True)
+                # Write to a scratch file and rename, so readers never see a partial entry
+                fd, tmp_path = tempfile.mkstemp(dir=namespace_dir, suffix='.tmp')
+                try:
+                    with os.fdopen(fd, 'wb') as f:
+                        np.savez(f, *result)
+                    os.replace(tmp_path, cache_file)
+                except BaseException:
+                    os.unlink(tmp_path)
+                    raise
+                _evict(namespace_dir, get_max_bytes())
+            except Exception as e:
+                logger.warning("Could not write cache entry %s: %s", cache_file, e)
+
+            return result
+
+        return wrapper
+    return decorator
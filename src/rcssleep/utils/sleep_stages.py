@@ -2,6 +2,8 @@
 Sleep stage mappings and utilities.
 """
 
+import numpy as np
+
 # Standard sleep stage mappings
 SLEEP_STAGE_MAP = {
     2: "N3",
@@ -23,6 +25,32 @@ SLEEP_STAGE_MAP_ALT = {
 }
 
 
+
+def _stage_codes(labels, mapping):
+    """Return the stage codes in mapping whose label is one of labels."""
+    return frozenset(code for code, label in mapping.items() if label in labels)
+
+
+# Stage codes per class for the default mapping (SLEEP_STAGE_MAP)
+_NREM_CODES = _stage_codes(("N2", "N3"), SLEEP_STAGE_MAP)
+_REM_CODES = _stage_codes(("REM",), SLEEP_STAGE_MAP)
+_WAKE_CODES = _stage_codes(("Wake",), SLEEP_STAGE_MAP)
+
+
+def _build_stage_lut(mapping):
+    """Build a label lookup table indexed by stage code ('' for unmapped codes)."""
+    codes = [code for code in mapping if isinstance(code, int) and code >= 0]
+    lut = np.full(max(codes, default=-1) + 1, '', dtype='<U4')
+    for code in codes:
+        lut[code] = mapping[code]
+    return lut
+
+
+# Label lookup table for the default mapping (SLEEP_STAGE_MAP)
+_STAGE_LUT = _build_stage_lut(SLEEP_STAGE_MAP)
+_STAGE_LUT.flags.writeable = False
+
+
 def map_sleep_stage(stage_value, mapping=None):
     """
     Map numeric sleep stage value to string label.
@@ -40,20 +68,101 @@ def map_sleep_stage(stage_value, mapping=None):
     return mapping.get(stage_value, None)
 
 
+def map_sleep_stages_array(stages, mapping=None):
+    """
+    Map an array of numeric sleep stage values to string labels.
+    
+    Vectorized counterpart of map_sleep_stage, using a lookup table indexed by
+    stage code. Values not in the mapping (including NaN) map to ''.
+    
+    Args:
+        stages: Array of numeric sleep stage values
+        mapping: Dictionary mapping, defaults to SLEEP_STAGE_MAP
+        
+    Returns:
+        np.array: Array of sleep stage labels with the same shape as stages
+    """
+    lut = _STAGE_LUT if mapping is None else _build_stage_lut(mapping)
+    stages = np.asarray(stages)
+    
+    valid = (stages >= 0) & (stages < len(lut))
+    if stages.dtype.kind == 'f':
+        valid &= stages == np.floor(stages)
+    codes = np.where(valid, stages, 0).astype(np.intp)
+    
+    return np.where(valid, lut[codes] if len(lut) else '', '')
+
+
 def is_nrem_stage(stage_value, mapping=None):
     """Check if stage value corresponds to NREM sleep (N2 or N3)."""
+    if mapping is None:
+        return stage_value in _NREM_CODES
     stage_label = map_sleep_stage(stage_value, mapping)
     return stage_label in ["N2", "N3"]
 
 
 def is_rem_stage(stage_value, mapping=None):
     """Check if stage value corresponds to REM sleep."""
+    if mapping is None:
+        return stage_value in _REM_CODES
     stage_label = map_sleep_stage(stage_value, mapping)
     return stage_label == "REM"
 
 
 def is_wake_stage(stage_value, mapping=None):
     """Check if stage value corresponds to wake."""
+    if mapping is None:
+        return stage_value in _WAKE_CODES
     stage_label = map_sleep_stage(stage_value, mapping)
     return stage_label == "Wake"
 
+
+def _is_stage_array(stages, codes):
+    """Element-wise membership of stage values in a set of stage codes."""
+    return np.isin(np.asarray(stages), np.array(sorted(codes)))
+
+
+def is_nrem_stage_array(stages, mapping=None):
+    """
+    Check which stage values correspond to NREM sleep (N2 or N3), for a whole array.
+    
+    Args:
+        stages: Array of numeric sleep stage values
+        mapping: Dictionary mapping, defaults to SLEEP_STAGE_MAP
+        
+    Returns:
+        np.array: Boolean array with the same shape as stages
+    """
+    codes = _NREM_CODES if mapping is None else _stage_codes(("N2", "N3"), mapping)
+    return _is_stage_array(stages, codes)
+
+
+def is_rem_stage_array(stages, mapping=None):
+    """
+    Check which stage values correspond to REM sleep, for a whole array.
+    
+    Args:
+        stages: Array of numeric sleep stage values
+        mapping: Dictionary mapping, defaults to SLEEP_STAGE_MAP
+        
+    Returns:
+        np.array: Boolean array with the same shape as stages
+    """
+    codes = _REM_CODES if mapping is None else _stage_codes(("REM",), mapping)
+    return _is_stage_array(stages, codes)
+
+
+def is_wake_stage_array(stages, mapping=None):
+    """
+    Check which stage values correspond to wake, for a whole array.
+    
+    Args:
+        stages: Array of numeric sleep stage values
+        mapping: Dictionary mapping, defaults to SLEEP_STAGE_MAP
+        
+    Returns:
+        np.array: Boolean array with the same shape as stages
+    """
+    codes = _WAKE_CODES if mapping is None else _stage_codes(("Wake",), mapping)
+    return _is_stage_array(stages, codes)
+
@@ -0,0 +1,60 @@
+"""
+Tests for rcssleep.signals.filtering.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'src'))
+
+from rcssleep.signals.filtering import (
+    apply_bandpass_filter,
+    apply_bandpass_filter_preserve_nan,
+    apply_filters,
+)
+
+
+FS = 500.0
+
+
+def test_preserve_nan_2d_keeps_nan_positions_per_channel():
+    rng = np.random.default_rng(0)
+    data = rng.standard_normal((3, 2000))
+    data[1, 500:600] = np.nan
+    
+    filtered = apply_bandpass_filter_preserve_nan(data, FS, 1.0, 40.0)
+    
+    assert filtered.shape == data.shape
+    assert np.array_equal(np.isnan(filtered), np.isnan(data))
+    # Each channel matches filtering it on its own
+    for channel in range(data.shape[0]):
+        expected = apply_bandpass_filter_preserve_nan(data[channel], FS, 1.0, 40.0)
+        np.testing.assert_allclose(filtered[channel], expected, equal_nan=True)
+
+
+def test_preserve_nan_2d_short_rows_without_nan_are_filtered():
+    rng = np.random.default_rng(1)
+    # Rows shorter than the filter's default padding (27 samples for order 4)
+    data = rng.standard_normal((4, 20))
+    
+    filtered = apply_bandpass_filter_preserve_nan(data, FS, 1.0, 40.0)
+    
+    assert not np.allclose(filtered, data)
+    for channel in range(data.shape[0]):
+        expected = apply_bandpass_filter_preserve_nan(data[channel], FS, 1.0, 40.0)
+        np.testing.assert_allclose(filtered[channel], expected)
+
+
+def test_complex_input_keeps_imaginary_part():
+    rng = np.random.default_rng(2)
+    real = rng.standard_normal(5000)
+    data = real * (1 + 1j)
+    
+    filtered = apply_bandpass_filter(data, FS, 1.0, 40.0)
+    
+    assert np.iscomplexobj(filtered)
+    np.testing.assert_allclose(filtered, apply_bandpass_filter(real, FS, 1.0, 40.0) * (1 + 1j))
+    assert apply_filters(data, FS).dtype == np.complex128
+    assert apply_filters(data.astype(np.complex64), FS).dtype == np.complex64